@@ -0,0 +1,136 @@
+import argparse
+import json
+import multiprocessing
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from scene import *
+
+NODE_COUNTS = (10, 100, 1000, 10_000, 100_000)
+DEGREES = (2, 8)
+# one mobject per vertex and edge stops being practical well before 100k nodes
+FULL_MOBJECT_LIMIT = 10_000
+FRAMES = 30
+# changes smaller than these, in each metric's own unit, are scheduler or allocator noise rather than regressions
+NOISE_FLOORS = {
+	"create_vertices": 0.01,
+	"create_edges": 0.01,
+	"construct": 0.01,
+	"animate_frame": 1e-4,
+	"move_and_scale_frame": 1e-4,
+	"create_frame": 1e-4,
+	"rasterize_frame": 1e-3,
+	"peak_rss_mb": 8,
+}
+DEFAULT_BASELINE = Path(__file__).parent / "benchmark_baseline.json"
+
+class TimedGraph(MyGraph):
+	def __init__(self, *args, **kwargs):
+		self.timings = {}
+		super().__init__(*args, **kwargs)
+
+	def create_vertices(self):
+		start = time.perf_counter()
+		super().create_vertices()
+		self.timings["create_vertices"] = time.perf_counter() - start
+
+	def create_edges(self):
+		start = time.perf_counter()
+		super().create_edges()
+		self.timings["create_edges"] = time.perf_counter() - start
+
+def random_graph(node_count, degree, seed=0):
+	rng = np.random.default_rng(seed)
+	positions = rng.uniform([-14, -8, 0], [14, 8, 0], size=(node_count, 3))
+	pairs = rng.integers(0, node_count, size=(node_count * degree // 2, 2))
+	pairs = pairs[pairs[:, 0] != pairs[:, 1]]
+	pairs = np.unique(np.sort(pairs, axis=1), axis=0)
+	return {i: position for i, position in enumerate(positions)}, [(int(a), int(b)) for a, b in pairs]
+
+def cases(max_nodes):
+	for node_count in NODE_COUNTS:
+		if node_count > max_nodes:
+			continue
+		for degree in DEGREES:
+			for directed in (False, True):
+				for compact in (True, False):
+					if not compact and node_count > FULL_MOBJECT_LIMIT:
+						continue
+					yield dict(node_count=node_count, degree=degree, directed=directed, compact=compact)
+
+def case_name(case):
+	return f"n{case['node_count']}_d{case['degree']}_{'directed' if case['directed'] else 'undirected'}_{'compact' if case['compact'] else 'full'}"
+
+def time_frames(animation, frames=FRAMES):
+	animation.begin()
+	start = time.perf_counter()
+	for alpha in np.linspace(0, 1, frames):
+		animation.interpolate(alpha)
+	elapsed = (time.perf_counter() - start) / frames
+	animation.finish()
+	return elapsed
+
+def run_case(case):
+	positions, edges = random_graph(case["node_count"], case["degree"])
+	start = time.perf_counter()
+	graph = TimedGraph(positions, edges, directed=case["directed"], compact_edges=case["compact"], compact_vertices=case["compact"], duplicate_edges="keep")
+	metrics = dict(graph.timings, construct=time.perf_counter() - start)
+	# the generic .animate path a scene would write, then the graph's own affine fast path
+	metrics["animate_frame"] = time_frames(graph.animate.move_to(UP).scale(0.5).build())
+	metrics["move_and_scale_frame"] = time_frames(graph.move_and_scale(DOWN, 2))
+	metrics["create_frame"] = time_frames(Create(graph.edge_lines))
+	camera = Camera()
+	start = time.perf_counter()
+	camera.capture_mobjects([graph])
+	metrics["rasterize_frame"] = time.perf_counter() - start
+	# ru_maxrss is in kilobytes on Linux and bytes on macOS
+	peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+	metrics["peak_rss_mb"] = peak / (2 ** 20 if sys.platform == "darwin" else 2 ** 10)
+	return dict(case, name=case_name(case), edge_count=len(graph.edges), metrics=metrics)
+
+def run(max_nodes):
+	# every case runs in a fresh process so its peak memory is its own
+	context = multiprocessing.get_context("spawn")
+	results = []
+	for case in cases(max_nodes):
+		with ProcessPoolExecutor(1, mp_context=context) as pool:
+			result = pool.submit(run_case, case).result()
+		print(f"{result['name']:<36}" + "  ".join(f"{metric} {value:.4g}" for metric, value in result["metrics"].items()), flush=True)
+		results.append(result)
+	return results
+
+def compare(results, baseline, tolerance):
+	reference = {result["name"]: result["metrics"] for result in baseline}
+	regressions = []
+	for result in results:
+		for metric, value in result["metrics"].items():
+			previous = reference.get(result["name"], {}).get(metric)
+			if previous and value > previous * (1 + tolerance) and value - previous > NOISE_FLOORS.get(metric, 0):
+				regressions.append(f"{result['name']} {metric}: {previous:.4g} -> {value:.4g} ({value / previous - 1:+.0%})")
+	return regressions
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(description="Time MyGraph construction, animation and rasterization at scale.")
+	parser.add_argument("--max-nodes", type=int, default=max(NODE_COUNTS))
+	parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+	parser.add_argument("--save-baseline", action="store_true", help="overwrite the baseline with this run")
+	parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown before a metric counts as a regression")
+	args = parser.parse_args()
+	results = run(args.max_nodes)
+	output = Path(config.media_dir) / "benchmarks" / f"{time.strftime('%Y%m%d-%H%M%S')}.json"
+	output.parent.mkdir(parents=True, exist_ok=True)
+	output.write_text(json.dumps(results, indent=1))
+	print(f"results written to {output}")
+	if args.save_baseline:
+		args.baseline.write_text(json.dumps(results, indent=1))
+		print(f"baseline written to {args.baseline}")
+	elif args.baseline.exists():
+		regressions = compare(results, json.loads(args.baseline.read_text()), args.tolerance)
+		print("\n".join(regressions) if regressions else "no regressions against the baseline")
+		sys.exit(1 if regressions else 0)
+	else:
+		print(f"no baseline at {args.baseline}, nothing was compared; run with --save-baseline to record one", file=sys.stderr)
+		sys.exit(1)
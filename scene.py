@@ -1,45 +1,1977 @@
 from manim import *
+import av
+import dataclasses
+import datetime
 import numpy as np
+import hashlib
+import os
+import heapq
+import inspect
+import json
+import pickle
+import re
+import srt
+import sys
+import time
+import weakref
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from fractions import Fraction
+from pathlib import Path
+
+try:
+	from manim.scene.video_segment_encoder import VideoSegmentEncoder
+	from manim.scene.scene_file_writer import _PartialMovieEncodeJob
+except ImportError:  # older manim versions pipe every frame to ffmpeg themselves
+	VideoSegmentEncoder = None
+
+TEXT_CACHE_SIZE = 512
+TEXT_RECYCLE_SIZE = 4096
+PARALLEL_MIN_FRAMES = 240
+DRAFT_HEIGHT = 270
+DRAFT_MAX_STRIDE = 8
+# mean absolute change per channel, on a 0-255 scale, below which a draft frame counts as unchanged
+DRAFT_CHANGE_THRESHOLD = 0.5
+
+def text_cache_dir():
+	cache_dir = Path(config.media_dir) / "text_cache"
+	cache_dir.mkdir(parents=True, exist_ok=True)
+	return cache_dir
+
+def text_cache_key(kind, text, **kwargs):
+	# markup carries the color spans, so it is hashed verbatim together with font/size/style kwargs
+	spec = repr((kind.__name__, text, sorted(kwargs.items())))
+	return hashlib.sha256(spec.encode()).hexdigest()[:24]
+
+def text_path_arrays(mob):
+	glyphs = mob.family_members_with_points()
+	return dict(
+		points=np.concatenate([glyph.points for glyph in glyphs]) if glyphs else np.zeros((0, 3)),
+		ends=np.cumsum([len(glyph.points) for glyph in glyphs], dtype=int),
+		fill=np.array([glyph.get_fill_rgbas()[0] for glyph in glyphs]).reshape(-1, 4),
+		stroke=np.array([glyph.get_stroke_rgbas()[0] for glyph in glyphs]).reshape(-1, 4),
+		stroke_width=np.array([glyph.get_stroke_width() for glyph in glyphs], dtype=float),
+	)
+
+def save_text_paths(path, arrays):
+	tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+	with open(tmp_path, "wb") as f:
+		np.savez(f, **arrays)
+	os.replace(tmp_path, path)
+
+def text_path_group(data, free_glyphs=None):
+	group = VGroup()
+	starts = np.concatenate([[0], data["ends"][:-1]]).astype(int)
+	for start, end, fill, stroke, width in zip(starts, data["ends"], data["fill"], data["stroke"], data["stroke_width"]):
+		# a released glyph with the same point count is reused along with its point buffer
+		shells = free_glyphs.get(end - start) if free_glyphs else None
+		if shells:
+			glyph = shells.pop()
+			glyph.points[:] = data["points"][start:end]
+		else:
+			glyph = VMobject()
+			glyph.set_points(data["points"][start:end])
+		glyph.set_fill(rgb_to_color(fill[:3]), opacity=fill[3])
+		glyph.set_stroke(rgb_to_color(stroke[:3]), width=width, opacity=stroke[3])
+		group.add(glyph)
+	return group
+
+def load_text_paths(path, free_glyphs=None):
+	with np.load(path) as data:
+		return text_path_group(data, free_glyphs)
+
+def evict_text_cache(cache_dir):
+	entries = sorted(cache_dir.glob("*.npz"), key=lambda entry: entry.stat().st_mtime)
+	for entry in entries[:max(0, len(entries) - TEXT_CACHE_SIZE)]:
+		entry.unlink(missing_ok=True)
+
+def cached_text(kind, text, free_glyphs=None, **kwargs):
+	# hits and misses both return the flat group of glyph paths, so callers and play hashes never see the difference
+	cache_dir = text_cache_dir()
+	path = cache_dir / f"{text_cache_key(kind, text, **kwargs)}.npz"
+	try:
+		os.utime(path)
+		return load_text_paths(path, free_glyphs)
+	except FileNotFoundError:
+		# missing, or evicted by another process in between
+		pass
+	arrays = text_path_arrays(kind(text, **kwargs))
+	save_text_paths(path, arrays)
+	evict_text_cache(cache_dir)
+	return text_path_group(arrays, free_glyphs)
+
+def prewarm_text(kind, text, kwargs):
+	cached_text(kind, text, **kwargs)
+
+CAPTION_SPAN = re.compile(r'<span fgcolor="(#[0-9A-Fa-f]{6})">(.*?)</span>', re.S)
+
+class CaptionText(Rectangle):
+	# stands in for a narration line that goes to the caption track: it keeps a rough monospace footprint
+	# so the layout around it holds, but it is never laid out as text and draws nothing
+	def __init__(self, markup, font_size=DEFAULT_FONT_SIZE, **kwargs):
+		self.markup = markup
+		lines = re.sub(r"<[^>]*>", "", markup).strip().splitlines() or [""]
+		em = 0.5 * font_size / DEFAULT_FONT_SIZE
+		super().__init__(width=max(0.6 * em * max(len(line.strip()) for line in lines), em), height=em * len(lines), stroke_opacity=0, fill_opacity=0)
+
+def srt_caption(markup):
+	return CAPTION_SPAN.sub(r'<font color="\1">\2</font>', " ".join(markup.split()))
+
+def vtt_caption(markup):
+	return CAPTION_SPAN.sub(lambda match: f"<c.c{match[1][1:].lower()}>{match[2]}</c>", " ".join(markup.split()))
+
+def vtt_timestamp(seconds):
+	# rounded to whole milliseconds first, so a clock just short of a minute cannot print as 60.000
+	seconds, milliseconds = divmod(round(seconds * 1000), 1000)
+	minutes, seconds = divmod(seconds, 60)
+	hours, minutes = divmod(minutes, 60)
+	return f"{hours:02}:{minutes:02}:{seconds:02}.{milliseconds:03}"
+
+def write_srt(path, cues):
+	subtitles = [srt.Subtitle(index=index + 1, start=datetime.timedelta(seconds=float(start)), end=datetime.timedelta(seconds=float(end)), content=srt_caption(markup)) for index, (start, end, markup) in enumerate(cues)]
+	path.parent.mkdir(parents=True, exist_ok=True)
+	path.write_text(srt.compose(subtitles), encoding="utf-8")
+
+def write_vtt(path, cues):
+	colors = sorted({color.lower() for _, _, markup in cues for color, _ in CAPTION_SPAN.findall(markup)})
+	lines = ["WEBVTT", ""]
+	if colors:
+		lines += ["STYLE", *(f"::cue(.c{color[1:]}) {{ color: {color}; }}" for color in colors), ""]
+	for start, end, markup in cues:
+		lines += [f"{vtt_timestamp(start)} --> {vtt_timestamp(end)}", vtt_caption(markup), ""]
+	path.parent.mkdir(parents=True, exist_ok=True)
+	path.write_text("\n".join(lines), encoding="utf-8")
+
+class NarrationPool:
+	def __init__(self, specs, max_workers=None, captions=False):
+		self.specs = dict(specs)
+		# in caption mode plain and markup narration becomes CaptionText, so it is neither prewarmed nor laid out
+		self.captioned = {name for name, (kind, _, _) in specs.items() if kind in (MarkupText, Text)} if captions else set()
+		specs = {name: spec for name, spec in specs.items() if name not in self.captioned}
+		self.executor = ProcessPoolExecutor(max_workers=max_workers)
+		# TeX blocks are the slowest to compile, so they are queued first and overlap with everything before them
+		order = sorted(specs, key=lambda name: specs[name][0] is not Tex)
+		self.futures = {name: self.executor.submit(prewarm_text, *specs[name]) for name in order}
+		self.seconds = {}
+		self.requested = set()
+		self.issued = weakref.WeakSet()
+		self.free_glyphs = {}
+
+	def submit(self, specs):
+		for name, spec in specs.items():
+			self.specs[name] = spec
+			self.futures[name] = self.executor.submit(prewarm_text, *spec)
+		return list(specs)
+
+	def issue(self, name, spec):
+		# like pool[name], but text that was not known up front is queued first instead of raising
+		if name not in self.specs:
+			self.submit({name: spec})
+		return self[name]
+
+	def __getitem__(self, name):
+		self.requested.add(name)
+		kind, text, kwargs = self.specs[name]
+		if name in self.captioned:
+			return CaptionText(text, font_size=kwargs.get("font_size", DEFAULT_FONT_SIZE))
+		start = time.perf_counter()
+		self.futures[name].result()
+		text = cached_text(kind, text, free_glyphs=self.free_glyphs, **kwargs)
+		self.seconds[kind.__name__] = self.seconds.get(kind.__name__, 0) + time.perf_counter() - start
+		self.issued.add(text)
+		return text
+
+	def release(self, *texts):
+		# glyphs of texts that are done go to free lists keyed by point count, where lines in the same font
+		# find matching shapes; past TEXT_RECYCLE_SIZE they are dropped and their point arrays freed
+		free_count = sum(len(shells) for shells in self.free_glyphs.values())
+		for text in texts:
+			self.issued.discard(text)
+			for glyph in text.family_members_with_points():
+				if free_count < TEXT_RECYCLE_SIZE:
+					self.free_glyphs.setdefault(len(glyph.points), []).append(glyph)
+					free_count += 1
+			text.remove(*text.submobjects)
+
+	def shutdown(self):
+		self.executor.shutdown(wait=False, cancel_futures=True)
+
+LAYOUT_GRID_THRESHOLD = 1000
+
+def repulsion_pairs(positions, cell_size):
+	# pairs of nodes in the same or adjacent grid cells, found by sorting cell keys instead of comparing all pairs
+	cells = np.floor(positions / cell_size).astype(np.int64)
+	cells -= cells.min(axis=0) - 1
+	height = cells[:, 1].max() + 2
+	keys = cells[:, 0] * height + cells[:, 1]
+	order = np.argsort(keys, kind="stable")
+	sorted_keys = keys[order]
+	firsts, seconds = [], []
+	for dx in (-1, 0, 1):
+		for dy in (-1, 0, 1):
+			neighbor_keys = keys + dx * height + dy
+			starts = np.searchsorted(sorted_keys, neighbor_keys, side="left")
+			counts = np.searchsorted(sorted_keys, neighbor_keys, side="right") - starts
+			entries = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts) + np.repeat(starts, counts)
+			firsts.append(np.repeat(np.arange(len(positions)), counts))
+			seconds.append(order[entries])
+	firsts, seconds = np.concatenate(firsts), np.concatenate(seconds)
+	distinct = firsts != seconds
+	return firsts[distinct], seconds[distinct]
+
+def force_layout(node_count, edge_indices, iterations=50, seed=0):
+	# Fruchterman-Reingold; repulsion is exact below LAYOUT_GRID_THRESHOLD nodes and grid-approximated above it
+	rng = np.random.default_rng(seed)
+	ideal = 1.0
+	positions = rng.uniform(-1, 1, (node_count, 2)) * np.sqrt(node_count)
+	temperature = np.sqrt(node_count) / 10 + ideal
+	cooling = temperature / (iterations + 1)
+	for _ in range(iterations):
+		if node_count <= LAYOUT_GRID_THRESHOLD:
+			deltas = positions[:, None, :] - positions[None, :, :]
+			distances = np.maximum((deltas ** 2).sum(axis=-1), 1e-9)
+			displacement = (deltas * (ideal ** 2 / distances)[..., None]).sum(axis=1)
+		else:
+			firsts, seconds = repulsion_pairs(positions, 2 * ideal)
+			deltas = positions[firsts] - positions[seconds]
+			distances = np.maximum((deltas ** 2).sum(axis=-1), 1e-9)
+			forces = deltas * (ideal ** 2 / distances)[:, None]
+			displacement = np.stack([np.bincount(firsts, forces[:, axis], minlength=node_count) for axis in range(2)], axis=1)
+		if len(edge_indices):
+			deltas = positions[edge_indices[:, 0]] - positions[edge_indices[:, 1]]
+			forces = deltas * (np.linalg.norm(deltas, axis=1) / ideal)[:, None]
+			for axis in range(2):
+				displacement[:, axis] -= np.bincount(edge_indices[:, 0], forces[:, axis], minlength=node_count)
+				displacement[:, axis] += np.bincount(edge_indices[:, 1], forces[:, axis], minlength=node_count)
+		lengths = np.maximum(np.linalg.norm(displacement, axis=1), 1e-9)
+		positions += displacement * (np.minimum(lengths, temperature) / lengths)[:, None]
+		temperature -= cooling
+	return positions
+
+def auto_layout(nodes, edges, width=10, height=6, iterations=50, seed=0):
+	nodes = list(nodes) if nodes is not None else list(dict.fromkeys(node for edge in edges for node in edge))
+	if not nodes:
+		return {}
+	node_index = {node: i for i, node in enumerate(nodes)}
+	edge_indices = np.array([[node_index[start_node], node_index[end_node]] for start_node, end_node in edges], dtype=int).reshape(-1, 2)
+	spec = repr((nodes, edge_indices.tolist(), width, height, iterations, seed))
+	cache_dir = Path(config.media_dir) / "layout_cache"
+	cache_dir.mkdir(parents=True, exist_ok=True)
+	path = cache_dir / f"{hashlib.sha256(spec.encode()).hexdigest()[:24]}.npy"
+	if path.exists():
+		positions = np.load(path)
+	else:
+		positions = force_layout(len(nodes), edge_indices, iterations, seed)
+		positions -= (positions.min(axis=0) + positions.max(axis=0)) / 2
+		extent = np.maximum(np.ptp(positions, axis=0), 1e-9)
+		positions *= min(width / extent[0], height / extent[1])
+		positions = np.column_stack([positions, np.zeros(len(nodes))])
+		# written aside and moved into place, so a farm worker never loads a half-written layout
+		tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+		with open(tmp_path, "wb") as f:
+			np.save(f, positions)
+		os.replace(tmp_path, path)
+	return {node: position for node, position in zip(nodes, positions)}
+
+if VideoSegmentEncoder is not None:
+	class StillFrameEncoder(VideoSegmentEncoder):
+		encode_seconds = 0
+		# the block count is process-wide, so this also includes whatever the render thread allocates meanwhile
+		encode_blocks = 0
+		outputs = ()
+		# frame numbers that start a play; they are encoded as keyframes so plays can later be cut out without re-encoding
+		keyframes = frozenset()
+
+		def write_frame(self, pixels, *, repeat=1):
+			start = time.perf_counter()
+			blocks = sys.getallocatedblocks()
+			try:
+				self.encode_frame(pixels, repeat)
+				for output in self.outputs:
+					output.encode_frame(pixels, repeat)
+			finally:
+				self.encode_seconds += time.perf_counter() - start
+				self.encode_blocks += sys.getallocatedblocks() - blocks
+
+		def finish(self):
+			super().finish()
+			for output in self.outputs:
+				output.finish()
+
+		def abort(self):
+			for output in self.outputs:
+				output.abort()
+			super().abort()
+
+		def encode_frame(self, pixels, repeat):
+			# a held frame is converted to the stream's pixel format once and the same
+			# yuv frame is re-stamped for every repeat, so the segment keeps a constant frame rate
+			if repeat == 1 and self._next_pts not in self.keyframes:
+				return super().write_frame(pixels)
+			self._validate_frame(pixels, repeat)
+			try:
+				self.mux_frame(av.VideoFrame.from_ndarray(pixels, format="rgba").reformat(format=self._stream.pix_fmt), repeat)
+			except BaseException as error:
+				raise self._operation_error("encode", error) from error
+
+		def mux_frame(self, frame, repeat):
+			time_base = Fraction(self.spec.frame_rate.denominator, self.spec.frame_rate.numerator)
+			for _ in range(repeat):
+				frame.pts = self._next_pts
+				frame.time_base = time_base
+				frame.pict_type = av.video.frame.PictureType.I if frame.pts in self.keyframes else av.video.frame.PictureType.NONE
+				self._next_pts += 1
+				for packet in self._stream.encode(frame):
+					self._container.mux(packet)
+
+	class ScaledFrameEncoder(StillFrameEncoder):
+		def encode_frame(self, pixels, repeat):
+			# frames arrive at the rendered resolution and are scaled in the same swscale pass that converts them to yuv
+			try:
+				self.mux_frame(av.VideoFrame.from_ndarray(pixels, format="rgba").reformat(width=self.spec.width, height=self.spec.height, format=self._stream.pix_fmt), repeat)
+			except BaseException as error:
+				raise self._operation_error("encode", error) from error
+
+	class StillFrameFileWriter(SceneFileWriter):
+		# extra heights are encoded from the same rasterized frames, next to every segment and movie at the rendered size
+		output_heights = ()
+
+		def scaled_spec(self, height):
+			spec = self.video_encoder
+			# yuv 4:2:0 needs even dimensions
+			width = round(spec.width * height / spec.height / 2) * 2
+			return dataclasses.replace(spec, width=width, height=height)
+
+		@staticmethod
+		def scaled_path(path, height):
+			path = Path(path)
+			return path.parent / f"{height}p" / path.name
+
+		def scaled_movie_path(self, height):
+			return scaled_movie_path(self.gif_file_path if self.output_spec.is_gif else self.movie_file_path, height)
+
+		def new_encoder(self, target):
+			encoder = StillFrameEncoder(target=target, spec=self.video_encoder)
+			encoder.outputs = [ScaledFrameEncoder(target=self.scaled_path(target, height), spec=self.scaled_spec(height)) for height in self.output_heights]
+			return encoder
+
+		def is_already_cached(self, hash_invocation):
+			if not super().is_already_cached(hash_invocation):
+				return False
+			path = self.output_plan.segment_path(hash_invocation)
+			return all(self.scaled_path(path, height).exists() for height in self.output_heights)
+
+		def combine_to_movie(self):
+			super().combine_to_movie()
+			partial_movie_files = [file for file in self.partial_movie_files if file is not None]
+			if not partial_movie_files:
+				return
+			final_file_path = self.final_file_path
+			for height in self.output_heights:
+				self.combine_files([str(self.scaled_path(file, height)) for file in partial_movie_files], self.scaled_movie_path(height), self.output_spec.is_gif)
+				self.print_file_ready_message(self.scaled_movie_path(height))
+			self.final_file_path = final_file_path
+
+		def open_partial_movie_stream(self, *, animation_index, file_path=None):
+			self.segment_index = animation_index
+			super().open_partial_movie_stream(animation_index=animation_index, file_path=file_path)
+
+		def _create_segment_encoder(self, target):
+			encoder = self.new_encoder(target)
+			if not hasattr(self, "segment_encoders"):
+				self.segment_encoders = {}
+			self.segment_encoders[self.segment_index] = encoder
+			return encoder
+
+		def detach_partial_movie(self):
+			# the open segment job is dropped and every encode thread is joined before frame workers are forked,
+			# so no child starts with codec or queue locks held by a thread that does not exist in it
+			job = self._current_encode_job
+			job.abort()
+			job.thread.join()
+			self._current_encode_job = None
+			self.spliced_segment = True
+			self.join_all_encode_jobs()
+			return job.path
+
+		def splice_partial_movie(self, segment, slice_files):
+			# the detached segment is rebuilt from the slices without re-encoding
+			self.combine_files(slice_files, segment)
+			for height in self.output_heights:
+				self.combine_files([str(self.scaled_path(slice_file, height)) for slice_file in slice_files], self.scaled_path(segment, height))
+			for slice_file in slice_files:
+				os.remove(slice_file)
+				for height in self.output_heights:
+					os.remove(self.scaled_path(slice_file, height))
+
+		def close_partial_movie_stream(self):
+			if getattr(self, "spliced_segment", False):
+				self.spliced_segment = False
+				return
+			super().close_partial_movie_stream()
+
+	class StreamingFileWriter(StillFrameFileWriter):
+		# every newly rendered play is appended to one long-lived encoder instead of its own partial movie file, starting
+		# on a keyframe; a side index of frame ranges per play hash lets unchanged plays be copied out of the previous
+		# stream packet by packet, and the stream is reassembled from both at the end
+		splice_partial_movie = None
+
+		def __init__(self, *args, **kwargs):
+			super().__init__(*args, **kwargs)
+			self.stream_job = None
+			self.stream_frames = 0
+			self.stream_index = []
+			self.stream_keyframes = set()
+			self.previous_index = None
+			self.cached_hash = None
+
+		@property
+		def stream_path(self):
+			# named after the output, so scenes rendering side by side into one partial movie directory keep apart
+			return self.partial_movie_directory / f"{self.output_name.name}_stream{self.output_spec.segment_extension}"
+
+		@property
+		def next_stream_path(self):
+			return self.stream_path.with_name(f"{self.stream_path.stem}.next{self.stream_path.suffix}")
+
+		def load_previous_index(self):
+			index_path = self.stream_path.with_suffix(".json")
+			self.previous_index = {}
+			# plays are only copied from a previous stream that has every height asked for now
+			streams = [self.stream_path, *(self.scaled_path(self.stream_path, height) for height in self.output_heights)]
+			if index_path.exists() and all(stream.exists() for stream in streams):
+				self.previous_index = {entry["hash"]: entry for entry in json.loads(index_path.read_text())}
+
+		def is_already_cached(self, hash_invocation):
+			if self.previous_index is None:
+				self.load_previous_index()
+			if hash_invocation in self.previous_index:
+				self.cached_hash = hash_invocation
+				return True
+			return False
+
+		def add_partial_movie_file(self, hash_animation):
+			super().add_partial_movie_file(hash_animation)
+			self.segment_hash = hash_animation
+			if hash_animation is not None and hash_animation == self.cached_hash:
+				self.cached_hash = None
+				entry = self.previous_index[hash_animation]
+				self.stream_index.append({"index": len(self.partial_movie_files) - 1, "hash": hash_animation, "source": self.stream_path, "start": entry["start"], "stop": entry["stop"]})
+
+		def new_encoder(self, target):
+			encoder = super().new_encoder(target)
+			# the set keeps growing while the encoder runs; a play's first frame is added before any of its frames are queued
+			encoder.keyframes = self.stream_keyframes
+			for output in encoder.outputs:
+				output.keyframes = self.stream_keyframes
+			return encoder
+
+		def _create_segment_encoder(self, target):
+			# one encoder spans every play, so its time is not attributed to the play that opened it
+			return self.new_encoder(target)
+
+		def open_partial_movie_stream(self, *, animation_index, file_path=None):
+			self.segment_index = animation_index
+			if self.stream_job is None:
+				self.stream_job = _PartialMovieEncodeJob(animation_index=animation_index, encoder=self._create_segment_encoder(self.next_stream_path), frame_queue_size=self.settings.encoder_queue_size)
+			self._current_encode_job = self.stream_job
+			self.segment_start = self.stream_frames
+			self.stream_keyframes.add(self.stream_frames)
+
+		def write_frame(self, pixels, *, repeat=1):
+			if self._current_encode_job is not None:
+				self.stream_frames += repeat
+			super().write_frame(pixels, repeat=repeat)
+
+		def close_partial_movie_stream(self):
+			# the job stays open for the next play; only the play's frame range is recorded
+			self._current_encode_job = None
+			self.stream_index.append({"index": self.segment_index, "hash": self.segment_hash, "source": self.next_stream_path, "start": self.segment_start, "stop": self.stream_frames})
+
+		def height_path(self, path, height):
+			return path if height is None else self.scaled_path(path, height)
+
+		def remux_frame_ranges(self, pieces, target):
+			# copies the packets of each (source, start, stop) frame range into target, re-stamped to follow on from the
+			# previous range; every range starts on a keyframe of a closed GOP, so its packets decode on their own
+			frame_rate = self.video_encoder.frame_rate
+			output = av.open(str(target), mode="w")
+			output_stream = None
+			position = 0
+			try:
+				for source, start, stop in pieces:
+					with av.open(str(source)) as container:
+						stream = container.streams.video[0]
+						if output_stream is None:
+							output_stream = output.add_stream_from_template(template=stream)
+						first_pts = None
+						for packet in container.demux(stream):
+							if packet.dts is None:
+								continue
+							if first_pts is None:
+								first_pts = packet.pts
+							frame = round((packet.pts - first_pts) * stream.time_base * frame_rate)
+							if frame < start or frame >= stop:
+								continue
+							packet.pts += round((position - start) / frame_rate / stream.time_base)
+							# consecutive ranges do not share a dts timeline, so libav derives it like in combine_files
+							packet.dts = None
+							packet.stream = output_stream
+							output.mux(packet)
+					position += stop - start
+			finally:
+				output.close()
+
+		def combine_to_movie(self):
+			if not self.stream_index:
+				return super().combine_to_movie()
+			if self.stream_job is not None:
+				job, self.stream_job = self.stream_job, None
+				job.seal()
+				job.join()
+			# neighbouring plays from the same source are copied as one range
+			pieces = []
+			for entry in self.stream_index:
+				if pieces and pieces[-1][0] == entry["source"] and pieces[-1][2] == entry["start"]:
+					pieces[-1][2] = entry["stop"]
+				else:
+					pieces.append([entry["source"], entry["start"], entry["stop"]])
+			assembled = self.stream_path.with_name(f"{self.stream_path.stem}.assembled{self.stream_path.suffix}")
+			heights = (None, *self.output_heights)
+			for height in heights:
+				self.remux_frame_ranges([(self.height_path(source, height), start, stop) for source, start, stop in pieces], self.height_path(assembled, height))
+			position = 0
+			for entry in self.stream_index:
+				length = entry.pop("stop") - entry.pop("start")
+				del entry["source"]
+				entry["start"], entry["stop"] = position, position + length
+				position += length
+			for height in heights:
+				self.height_path(assembled, height).replace(self.height_path(self.stream_path, height))
+				self.height_path(self.next_stream_path, height).unlink(missing_ok=True)
+			self.stream_path.with_suffix(".json").write_text(json.dumps(self.stream_index, indent=1))
+			# the single stream is only remuxed into the movie, audio is muxed in the same way as for partial files
+			self.partial_movie_files = [str(self.stream_path)]
+			super().combine_to_movie()
+
+		def abort_encode_jobs(self, reraise_encoder_failures=False):
+			if self.stream_job is not None:
+				self._current_encode_job, self.stream_job = self.stream_job, None
+			super().abort_encode_jobs(reraise_encoder_failures)
+
+# forked frame-range workers read the scene from here instead of unpickling it
+PARALLEL_PLAY = None
+
+def render_frame_range(start, stop, target):
+	scene = PARALLEL_PLAY
+	renderer = scene.renderer
+	encoder = renderer.file_writer.new_encoder(Path(target))
+	for t in np.arange(0, scene.duration, 1 / config.frame_rate)[start:stop]:
+		scene.update_to_time(t)
+		renderer.update_frame(scene, scene.moving_mobjects)
+		encoder.write_frame(renderer.get_frame())
+	encoder.finish()
+	return target
+
+def profile_dir():
+	return Path(config.media_dir) / "profiles"
+
+class StillFrameScene(Scene):
+	frame_workers = 1
+	profile_plays = bool(os.environ.get("PROFILE_PLAYS"))
+	stream_output = bool(os.environ.get("STREAM_OUTPUT"))
+	# e.g. OUTPUT_HEIGHTS=720,480 while rendering at 1080p publishes all three from one pass
+	output_heights = tuple(int(height) for height in os.environ.get("OUTPUT_HEIGHTS", "").split(",") if height)
+	draft = bool(os.environ.get("DRAFT"))
+
+	def __init__(self, renderer=None, **kwargs):
+		if self.draft and config.pixel_height > DRAFT_HEIGHT:
+			# drafts go to their own <height>p folder, so they never overwrite or satisfy full-quality caches
+			config.pixel_width = round(config.pixel_width * DRAFT_HEIGHT / config.pixel_height / 2) * 2
+			config.pixel_height = DRAFT_HEIGHT
+		# static waits reach the file writer as one frame with a repeat count, which StillFrameEncoder converts only once
+		if renderer is None and VideoSegmentEncoder is not None and config.renderer == RendererType.CAIRO:
+			# section videos are cut from partial movie files, so streaming is only used when none are saved
+			file_writer_class = StreamingFileWriter if self.stream_output and not config.save_sections else StillFrameFileWriter
+			renderer = CairoRenderer(file_writer_class=file_writer_class, camera_class=kwargs.get("camera_class", Camera), skip_animations=kwargs.get("skip_animations", False))
+		super().__init__(renderer=renderer, **kwargs)
+		if hasattr(self.renderer.file_writer, "output_heights"):
+			self.renderer.file_writer.output_heights = tuple(height for height in self.output_heights if height < config.pixel_height)
+		self.profile = []
+		self.profile_record = None
+		self.play_kind = "play"
+		self.play_start_time = None
+		if self.profile_plays:
+			# instance attributes shadow the per-frame methods, so unprofiled renders keep the plain ones
+			self.update_to_time = self.timed(self.update_to_time, "interpolate")
+			self.renderer.update_frame = self.timed(self.renderer.update_frame, "rasterize")
+			self.profile_mark = time.perf_counter()
+			self.profile_blocks = sys.getallocatedblocks()
+			self.profile_counters_mark = {}
+
+	def timed(self, function, phase):
+		def wrapper(*args, **kwargs):
+			start = time.perf_counter()
+			blocks = sys.getallocatedblocks()
+			try:
+				return function(*args, **kwargs)
+			finally:
+				self.add_profile_time(phase, time.perf_counter() - start, sys.getallocatedblocks() - blocks)
+		return wrapper
+
+	def add_profile_time(self, phase, seconds, blocks=0):
+		if self.profile_record is not None:
+			phases = self.profile_record["phases"]
+			phases[phase] = phases.get(phase, 0) + seconds
+			allocated = self.profile_record["allocated_blocks"]
+			allocated[phase] = allocated.get(phase, 0) + blocks
+
+	def profile_counters(self):
+		# cumulative seconds spent outside plays that subclasses can attribute, e.g. waiting on text layout
+		return {}
+
+	def play(self, *args, **kwargs):
+		# the renderer moves its clock past cached and skipped plays before their animations begin,
+		# so anything stamped while a play starts reads the time from here
+		self.play_start_time = self.renderer.time
+		try:
+			if self.profile_plays and self.profile_record is None:
+				self.profiled_play(*args, **kwargs)
+			else:
+				super().play(*args, **kwargs)
+		finally:
+			self.play_start_time = None
+		self.after_play()
+
+	def wait(self, *args, **kwargs):
+		# manim's wait goes through play, so the kind is marked here rather than guessed from the call stack
+		self.play_kind = "wait"
+		try:
+			return super().wait(*args, **kwargs)
+		finally:
+			self.play_kind = "play"
+
+	def after_play(self):
+		# runs once a play has finished and cleaned up, for subclasses that act on what it removed
+		pass
+
+	def profiled_play(self, *args, **kwargs):
+		# skip manim's frames and the play/wait wrappers of scene classes to reach the line that asked for this play
+		caller = sys._getframe(1)
+		manim_dir = str(Path(sys.modules["manim"].__file__).parent)
+		while caller.f_back is not None and (caller.f_code.co_filename.startswith(manim_dir) or (caller.f_code.co_name in ("play", "wait") and isinstance(caller.f_locals.get("self"), Scene))):
+			caller = caller.f_back
+		start = time.perf_counter()
+		blocks = sys.getallocatedblocks()
+		counters = self.profile_counters()
+		phases = {name: seconds - self.profile_counters_mark.get(name, 0) for name, seconds in counters.items()}
+		phases["construct"] = start - self.profile_mark - sum(phases.values())
+		self.profile_record = {
+			"index": self.renderer.num_plays,
+			"kind": self.play_kind,
+			"line": f"{Path(caller.f_code.co_filename).name}:{caller.f_lineno}",
+			"function": caller.f_code.co_name,
+			"phases": phases,
+			"allocated_blocks": {"construct": blocks - self.profile_blocks},
+		}
+		try:
+			super().play(*args, **kwargs)
+		finally:
+			record, self.profile_record = self.profile_record, None
+			self.profile_mark = time.perf_counter()
+			self.profile_blocks = sys.getallocatedblocks()
+			self.profile_counters_mark = counters
+			record["play_seconds"] = self.profile_mark - start
+			record["phases"]["setup"] = record["play_seconds"] - sum(record["phases"].get(phase, 0) for phase in ("interpolate", "rasterize", "frame_workers"))
+			record["allocated_blocks"]["setup"] = self.profile_blocks - blocks - sum(record["allocated_blocks"].get(phase, 0) for phase in ("interpolate", "rasterize", "frame_workers"))
+			self.profile.append(record)
+
+	def render(self, preview=False):
+		result = super().render(preview)
+		if self.profile_plays:
+			self.write_profile()
+		return result
+
+	def write_profile(self):
+		# encoding runs on the file writer's threads, so it is read back from each play's segment encoder at the end
+		encoders = getattr(self.renderer.file_writer, "segment_encoders", {})
+		for record in self.profile:
+			if record["index"] in encoders:
+				record["phases"]["encode"] = encoders[record["index"]].encode_seconds
+				record["allocated_blocks"]["encode"] = encoders[record["index"]].encode_blocks
+			record["total_seconds"] = sum(record["phases"].values())
+		path = profile_dir() / f"{type(self).__name__}.json"
+		path.parent.mkdir(parents=True, exist_ok=True)
+		path.write_text(json.dumps(self.profile, indent=1))
+		totals = {}
+		for record in self.profile:
+			for phase, seconds in record["phases"].items():
+				totals[phase] = totals.get(phase, 0) + seconds
+		lines = ["phase totals:"]
+		lines += [f"  {phase:<14}{seconds:10.3f}s" for phase, seconds in sorted(totals.items(), key=lambda item: -item[1])]
+		lines.append("plays by total time:")
+		for record in sorted(self.profile, key=lambda record: -record["total_seconds"]):
+			phases = "  ".join(f"{phase} {seconds:.3f}" for phase, seconds in sorted(record["phases"].items(), key=lambda item: -item[1]))
+			lines.append(f"  {record['total_seconds']:8.3f}s  #{record['index']:<4} {record['kind']:<5} {record['line']:<16} {phases}")
+		path.with_suffix(".txt").write_text("\n".join(lines) + "\n")
+
+	def can_split_play(self, frame_count, skip_rendering):
+		if skip_rendering or self.frame_workers < 2 or frame_count < PARALLEL_MIN_FRAMES:
+			return False
+		if self.stop_condition is not None or "fork" not in multiprocessing.get_all_start_methods():
+			return False
+		file_writer = self.renderer.file_writer
+		if getattr(file_writer, "splice_partial_movie", None) is None or file_writer._current_encode_job is None:
+			return False
+		# updaters integrate dt frame by frame, so only alpha-driven plays can start mid-way
+		return not any(mob.updaters for mobject in self.mobjects for mob in mobject.get_family())
+
+	def play_internal(self, skip_rendering=False):
+		self.duration = self.get_run_time(self.animations)
+		frame_count = len(np.arange(0, self.duration, 1 / config.frame_rate))
+		# cached and skipped plays go through the renderer's own fast-forward, which adds no frames
+		if self.draft and not skip_rendering and not self.renderer.skip_animations and self.stop_condition is None:
+			return self.play_draft()
+		if not self.can_split_play(frame_count, skip_rendering):
+			return super().play_internal(skip_rendering)
+		# each forked worker interpolates the animations to the start of its frame range,
+		# encodes that slice, and the slices are joined by stream copy into the play's segment
+		global PARALLEL_PLAY
+		file_writer = self.renderer.file_writer
+		segment = file_writer.detach_partial_movie()
+		workers = min(self.frame_workers, frame_count // (PARALLEL_MIN_FRAMES // 4))
+		bounds = np.linspace(0, frame_count, workers + 1).astype(int)
+		targets = [str(segment.with_name(f"{segment.stem}_slice{i:03}{segment.suffix}")) for i in range(workers)]
+		PARALLEL_PLAY = self
+		start = time.perf_counter()
+		try:
+			with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("fork")) as pool:
+				slice_files = list(pool.map(render_frame_range, bounds[:-1], bounds[1:], targets))
+		finally:
+			PARALLEL_PLAY = None
+		self.add_profile_time("frame_workers", time.perf_counter() - start)
+		file_writer.splice_partial_movie(segment, slice_files)
+		self.renderer.time += frame_count / config.frame_rate
+		for animation in self.animations:
+			animation.finish()
+			animation.clean_up_from_scene(self)
+		self.update_mobjects(0)
+		self.renderer.static_image = None
+
+	def play_draft(self):
+		# frames are rasterized at an adaptive stride and each one is held until the next, so a draft has
+		# exactly the frame count and timing of a full render while slow stretches cost only a few frames
+		renderer = self.renderer
+		times = np.arange(0, self.duration, 1 / config.frame_rate)
+		stride, i, previous = 1, 0, None
+		while i < len(times):
+			self.update_to_time(times[i])
+			renderer.update_frame(self, self.moving_mobjects)
+			frame = renderer.get_frame()
+			if previous is not None:
+				change = np.abs(frame[::8, ::8].astype(np.int16) - previous[::8, ::8]).mean()
+				stride = min(stride * 2, DRAFT_MAX_STRIDE) if change < DRAFT_CHANGE_THRESHOLD else 1
+			previous = frame
+			repeat = min(stride, len(times) - i)
+			renderer.add_frame(frame, num_frames=repeat)
+			i += repeat
+		for animation in self.animations:
+			animation.finish()
+			animation.clean_up_from_scene(self)
+		self.update_mobjects(0)
+		self.renderer.static_image = None
+
+def checkpoint_dir(scene_name):
+	return Path(config.media_dir) / "checkpoints" / scene_name
+
+class CheckpointScene(StillFrameScene):
+	sections = ()
+	checkpoint_attributes = ()
+	resume_section = os.environ.get("RESUME_SECTION")
+	final_section = None
+	# attributes that change what sections render without changing their code
+	render_attributes = ("draft", "output_heights")
+
+	def construct(self):
+		start = self.restore_checkpoint(self.resume_section) if self.resume_section else 0
+		resume = self.sections.index(self.resume_section) if self.resume_section else 0
+		for index in range(start, len(self.sections)):
+			name = self.sections[index]
+			# sections between the restored checkpoint and the requested one only rebuild state
+			self.next_section(name, skip_animations=index < resume)
+			self.section_start = self.renderer.time
+			getattr(self, f"section_{name}")()
+			self.save_checkpoint(name)
+			if name == self.final_section:
+				break
+
+	@classmethod
+	def section_key(cls, name, attributes=None):
+		# keyed by the code of every section up to this one and by everything else sections run on: the rest of the
+		# module sources, manim's version, render attributes and section inputs; editing a later section keeps it valid
+		attributes = attributes or {}
+		end = cls.sections.index(name) + 1
+		sources = [inspect.getsource(getattr(cls, f"section_{section}")) for section in cls.sections]
+		modules = []
+		for module in dict.fromkeys((__name__, cls.__module__)):
+			module_source = inspect.getsource(sys.modules[module])
+			for source in sources:
+				module_source = module_source.replace(source, "")
+			modules.append(module_source)
+		settings = {attribute: attributes.get(attribute, getattr(cls, attribute, None)) for attribute in cls.render_attributes}
+		key = (sources[:end], modules, sys.modules["manim"].__version__, settings, cls.checkpoint_attributes, cls.section_inputs(name, attributes))
+		return hashlib.sha256(repr(key).encode()).hexdigest()[:24]
+
+	@classmethod
+	def section_inputs(cls, name, attributes):
+		# data besides the section code that decides what a section renders; attributes override class attributes
+		return None
+
+	def section_captions(self):
+		# (start, end, markup) cues of the last section rendered, in seconds from its start; end is None
+		# for captions still shown when the section ends
+		return []
+
+	def checkpoint_path(self, name):
+		return checkpoint_dir(type(self).__name__) / f"{name}_{self.section_key(name, vars(self))}.pkl"
+
+	def save_checkpoint(self, name):
+		path = self.checkpoint_path(name)
+		path.parent.mkdir(parents=True, exist_ok=True)
+		state = {attribute: getattr(self, attribute) for attribute in self.checkpoint_attributes if hasattr(self, attribute)}
+		tmp = path.with_suffix(f".{os.getpid()}.tmp")
+		with open(tmp, "wb") as file:
+			pickle.dump((self.mobjects, self.foreground_mobjects, state), file, protocol=pickle.HIGHEST_PROTOCOL)
+		os.replace(tmp, path)
+
+	def restore_checkpoint(self, name):
+		if name not in self.sections:
+			raise ValueError(f"Unknown section {name!r}, expected one of {self.sections}")
+		# walk back to the nearest section whose end state is on disk and resume right after it
+		for index in range(self.sections.index(name), 0, -1):
+			path = self.checkpoint_path(self.sections[index - 1])
+			if not path.exists():
+				continue
+			with open(path, "rb") as file:
+				mobjects, foreground_mobjects, state = pickle.load(file)
+			self.add(*mobjects)
+			self.add_foreground_mobjects(*foreground_mobjects)
+			for attribute, value in state.items():
+				setattr(self, attribute, value)
+			return index
+		return 0
+
+def concat_videos(input_files, output_file):
+	output_file.parent.mkdir(parents=True, exist_ok=True)
+	manifest = output_file.with_suffix(".txt")
+	manifest.write_text("".join(f"file 'file:{Path(path).resolve().as_posix()}'\n" for path in input_files))
+	with av.open(str(manifest), format="concat", options={"safe": "0"}) as source, av.open(str(output_file), mode="w") as target:
+		stream = target.add_stream_from_template(template=source.streams.video[0])
+		for packet in source.demux(source.streams.video[0]):
+			if packet.dts is None:
+				continue
+			packet.dts = None
+			packet.stream = stream
+			target.mux(packet)
+	manifest.unlink()
+
+def scaled_movie_path(path, height):
+	return path.with_name(f"{path.stem}_{height}p{path.suffix}")
+
+def render_height(scene_class, attributes):
+	# the height a scene with these attributes renders at, as its __init__ settles it
+	return min(config.pixel_height, DRAFT_HEIGHT) if attributes.get("draft", scene_class.draft) else config.pixel_height
+
+def render_heights(scene_class, attributes):
+	# the extra output heights a scene with these attributes publishes
+	return tuple(height for height in attributes.get("output_heights", scene_class.output_heights) if height < render_height(scene_class, attributes))
+
+def render_resolution(scene_class, attributes):
+	# drafts are marked even where they keep the full height, since their plays are still held at a stride
+	draft = "_draft" if attributes.get("draft", scene_class.draft) else ""
+	return f"{render_height(scene_class, attributes)}p{config.frame_rate:g}{draft}"
+
+def render_section(scene_class, section, output_file, frame_workers, settings, name, attributes):
+	# each worker writes its own movie file so concurrent sections never share an output path
+	with tempconfig({**settings, "output_file": f"{name}_{section}"}):
+		# attributes are set before __init__, which reads output_heights and draft
+		scene = scene_class.__new__(scene_class)
+		vars(scene).update(attributes)
+		scene.__init__()
+		scene.resume_section = section
+		scene.final_section = section
+		scene.frame_workers = frame_workers
+		scene.render()
+		file_writer = scene.renderer.file_writer
+		os.replace(file_writer.movie_file_path, output_file)
+		for height in getattr(file_writer, "output_heights", ()):
+			os.replace(file_writer.scaled_movie_path(height), scaled_movie_path(output_file, height))
+		# the section's captions travel with its video, so render_batch can lay out the whole track
+		output_file.with_suffix(".json").write_text(json.dumps({"captions": scene.section_captions()}))
+	return output_file
+
+def section_track(output_file):
+	# the length comes from the video, which rounds every play up to whole frames
+	with av.open(str(output_file)) as container:
+		stream = container.streams.video[0]
+		duration = float(stream.frames / stream.average_rate)
+	sidecar = output_file.with_suffix(".json")
+	return duration, json.loads(sidecar.read_text())["captions"] if sidecar.exists() else []
+
+def merge_captions(outputs):
+	# section cues are shifted by the length of the sections before them; a caption still on screen when
+	# its section ends has no end and runs to the end of the video, or on into the next section's cue
+	cues, offset, continued = [], 0, {}
+	for output in outputs:
+		duration, captions = section_track(output)
+		still_open = {}
+		for start, end, markup in captions:
+			if start == 0 and markup in continued:
+				cue = continued.pop(markup)
+			else:
+				cue = [offset + start, None, markup]
+				cues.append(cue)
+			cue[1] = offset + (duration if end is None else end)
+			if end is None:
+				still_open[markup] = cue
+		continued = still_open
+		offset += duration
+	return sorted(cues)
+
+def render_farm(scene_class, workers=None):
+	return render_batch(scene_class, {scene_class.__name__: {}}, workers)[scene_class.__name__]
+
+def render_batch(scene_class, variants, workers=None):
+	# every section of every variant renders in one shared pool, rebuilding earlier state from checkpoints or
+	# skipped sections; a section's video is reused while its code, its inputs and the output resolution stay
+	# the same, so variants that share sections render them once. variants maps names to scene attributes.
+	farm_dir = Path(config.media_dir) / "farm" / scene_class.__name__
+	farm_dir.mkdir(parents=True, exist_ok=True)
+	outputs, jobs = {}, {}
+	for name, attributes in variants.items():
+		resolution = render_resolution(scene_class, attributes)
+		outputs[name] = [farm_dir / f"{section}_{scene_class.section_key(section, attributes)}_{resolution}.mp4" for section in scene_class.sections]
+		for section, output in zip(scene_class.sections, outputs[name]):
+			if not all(path.exists() for path in (output, *(scaled_movie_path(output, height) for height in render_heights(scene_class, attributes)))):
+				jobs.setdefault(output, (section, name, attributes))
+	workers = workers or max(1, min(len(jobs), os.cpu_count() or 1))
+	frame_workers = max(1, (os.cpu_count() or 1) // workers)
+	settings = {key: config[key] for key in ("media_dir", "pixel_width", "pixel_height", "frame_rate")}
+	with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+		for future in [pool.submit(render_section, scene_class, section, output, frame_workers, settings, name, attributes) for output, (section, name, attributes) in jobs.items()]:
+			future.result()
+	movies = {}
+	for name in variants:
+		movies[name] = farm_dir.parent / f"{name}_{render_resolution(scene_class, variants[name])}.mp4"
+		concat_videos(outputs[name], movies[name])
+		# scaled copies sit next to each section video and are joined the same way
+		for height in render_heights(scene_class, variants[name]):
+			concat_videos([scaled_movie_path(output, height) for output in outputs[name]], scaled_movie_path(movies[name], height))
+		cues = merge_captions(outputs[name])
+		if cues:
+			write_srt(movies[name].with_suffix(".srt"), cues)
+			write_vtt(movies[name].with_suffix(".vtt"), cues)
+	return movies
+
+def line_points(starts, ends):
+	deltas = ends - starts
+	return np.stack([starts, starts + deltas / 3, starts + 2 * deltas / 3, ends], axis=1)
+
+# what VMobject falls back to for unset style keys, so equivalent styles share a bucket
+STYLE_DEFAULTS = dict(fill_color=WHITE, fill_opacity=0.0, stroke_color=WHITE, stroke_opacity=1.0, stroke_width=DEFAULT_STROKE_WIDTH)
+
+class ShapeBatch(VGroup):
+	def __init__(self, item_points, style, **kwargs):
+		super().__init__(**kwargs)
+		item_points = np.asarray(item_points, dtype=float)
+		self.styles = []
+		self.buckets = {}
+		self.points_per_item = item_points.shape[1]
+		code = self.style_code(style)
+		self.item_styles = np.full(len(item_points), code, dtype=int)
+		self.put_items(code, np.arange(len(item_points)), item_points)
+
+	def style_code(self, style):
+		style = {**STYLE_DEFAULTS, **style}
+		style = tuple(sorted((key, rgb_to_hex(color_to_rgb(value)) if key.endswith("color") else round(float(value), 6)) for key, value in style.items()))
+		if style not in self.styles:
+			self.styles.append(style)
+		return self.styles.index(style)
+
+	def bucket_points(self, bucket):
+		return bucket.points.reshape(len(bucket.item_indices), -1, 3)
+
+	def put_items(self, code, indices, item_points):
+		# one VMobject per distinct style, each holding its items as consecutive subpaths
+		if not len(indices):
+			return
+		item_points = item_points.reshape(-1, 3)
+		bucket = self.buckets.get(code)
+		if bucket is None:
+			bucket = self.buckets[code] = VMobject(**dict(self.styles[code]))
+			bucket.set_points(item_points)
+			bucket.item_indices = indices
+			self.add(bucket)
+		else:
+			bucket.append_points(item_points)
+			bucket.item_indices = np.concatenate([bucket.item_indices, indices])
+
+	def take_items(self, code, indices):
+		# pulls the given items out of one bucket, returning them in bucket order
+		bucket = self.buckets[code]
+		taken = np.isin(bucket.item_indices, indices)
+		bucket_points = self.bucket_points(bucket)
+		item_points = bucket_points[taken]
+		indices = bucket.item_indices[taken]
+		if taken.all():
+			self.remove(bucket)
+			del self.buckets[code]
+		else:
+			bucket.set_points(bucket_points[~taken].reshape(-1, 3))
+			bucket.item_indices = bucket.item_indices[~taken]
+		return indices, item_points
+
+	def get_item_points(self):
+		item_points = np.zeros((len(self.item_styles), self.points_per_item, 3))
+		for bucket in self.buckets.values():
+			item_points[bucket.item_indices] = self.bucket_points(bucket)
+		return item_points
+
+	def add_items(self, item_points, style):
+		item_points = np.asarray(item_points, dtype=float).reshape(-1, self.points_per_item, 3)
+		code = self.style_code(style)
+		indices = np.arange(len(self.item_styles), len(self.item_styles) + len(item_points))
+		self.item_styles = np.concatenate([self.item_styles, np.full(len(item_points), code, dtype=int)])
+		self.put_items(code, indices, item_points)
+		return self
+
+	def remove_items(self, indices):
+		keep = np.ones(len(self.item_styles), dtype=bool)
+		keep[indices] = False
+		for code in np.unique(self.item_styles[~keep]):
+			self.take_items(code, np.flatnonzero(~keep))
+		# the remaining items keep their points, only their indices close up
+		new_indices = np.cumsum(keep) - 1
+		for bucket in self.buckets.values():
+			bucket.item_indices = new_indices[bucket.item_indices]
+		self.item_styles = self.item_styles[keep]
+		return self
+
+	def get_item_mobject(self, index):
+		# a standalone copy of one item, e.g. to animate it while the batch itself stays put
+		bucket = self.buckets[self.item_styles[index]]
+		item = VMobject(**dict(self.styles[self.item_styles[index]]))
+		item.set_points(self.bucket_points(bucket)[np.flatnonzero(bucket.item_indices == index)[0]])
+		return item
+
+	def set_item_style(self, indices, **style):
+		indices = np.atleast_1d(indices)
+		codes = self.item_styles[indices]
+		for code in np.unique(codes):
+			new_code = self.style_code({**dict(self.styles[code]), **style})
+			if new_code == code:
+				continue
+			moved, item_points = self.take_items(code, indices[codes == code])
+			self.item_styles[moved] = new_code
+			self.put_items(new_code, moved, item_points)
+		return self
+
+class EdgeBatch(ShapeBatch):
+	def __init__(self, starts, ends, color=GREY, stroke_width=DEFAULT_STROKE_WIDTH, **kwargs):
+		edge_points = line_points(np.asarray(starts, dtype=float), np.asarray(ends, dtype=float))
+		super().__init__(edge_points, dict(stroke_color=color, stroke_width=stroke_width), **kwargs)
+
+	def get_edge_points(self):
+		return self.get_item_points()
+
+	def add_edges(self, starts, ends, color=GREY, stroke_width=DEFAULT_STROKE_WIDTH):
+		edge_points = line_points(np.asarray(starts, dtype=float), np.asarray(ends, dtype=float))
+		return self.add_items(edge_points, dict(stroke_color=color, stroke_width=stroke_width))
+
+	def set_edge_style(self, indices, color=None, stroke_width=None):
+		style = dict(stroke_color=color, stroke_width=stroke_width)
+		return self.set_item_style(indices, **{key: value for key, value in style.items() if value is not None})
+
+	def remove_edges(self, indices):
+		return self.remove_items(indices)
+
+	def get_edge_mobject(self, index):
+		return self.get_item_mobject(index)
+
+	def set_edges_visible(self, indices, visible):
+		return self.set_item_style(indices, stroke_opacity=float(visible))
+
+# arrowhead corners in units of tip length: the point, then the two ends of the base
+TIP_CORNERS = np.array([[0, 0], [-1, 0.5], [-1, -0.5]])
+
+def arrow_points(starts, ends, buff=0.1, max_tip_length_to_length_ratio=0.05):
+	# the same shaft and tip sizes Arrow picks per edge, for all edges at once
+	deltas = ends - starts
+	lengths = np.linalg.norm(deltas, axis=1, keepdims=True)
+	directions = deltas / np.where(lengths > 0, lengths, 1)
+	normals = np.stack([-directions[:, 1], directions[:, 0], np.zeros(len(directions))], axis=1)
+	starts = starts + directions * buff
+	tips = ends - directions * buff
+	tip_lengths = np.minimum(DEFAULT_ARROW_TIP_LENGTH, max_tip_length_to_length_ratio * np.maximum(lengths - 2 * buff, 0))
+	corners = tips[:, None] + tip_lengths[:, None] * (TIP_CORNERS[None, :, :1] * directions[:, None] + TIP_CORNERS[None, :, 1:] * normals[:, None])
+	tip_points = np.concatenate([line_points(corners[:, i], corners[:, (i + 1) % 3]) for i in range(3)], axis=1)
+	return starts, tips - directions * tip_lengths, tip_points
+
+class ArrowBatch(EdgeBatch):
+	def __init__(self, starts, ends, color=GREY, stroke_width=DEFAULT_STROKE_WIDTH, buff=0.1, max_tip_length_to_length_ratio=0.05, **kwargs):
+		self.buff = buff
+		self.max_tip_length_to_length_ratio = max_tip_length_to_length_ratio
+		shaft_starts, shaft_ends, tip_points = arrow_points(np.asarray(starts, dtype=float), np.asarray(ends, dtype=float), buff, max_tip_length_to_length_ratio)
+		super().__init__(shaft_starts, shaft_ends, color, stroke_width, **kwargs)
+		# tips live in their own batch with one filled path per color, item i being the tip of edge i
+		self.tips = ShapeBatch(tip_points, dict(fill_color=color, fill_opacity=1, stroke_color=color, stroke_width=0))
+		self.add(self.tips)
+
+	def get_edge_points(self):
+		# an edge runs from its shaft start to the point of its tip, like Arrow.get_start/get_end
+		shafts = self.get_item_points()
+		return line_points(shafts[:, 0], self.tips.get_item_points()[:, 0])
+
+	def add_edges(self, starts, ends, color=GREY, stroke_width=DEFAULT_STROKE_WIDTH):
+		shaft_starts, shaft_ends, tip_points = arrow_points(np.asarray(starts, dtype=float), np.asarray(ends, dtype=float), self.buff, self.max_tip_length_to_length_ratio)
+		super().add_edges(shaft_starts, shaft_ends, color, stroke_width)
+		self.tips.add_items(tip_points, dict(fill_color=color, fill_opacity=1, stroke_color=color, stroke_width=0))
+		return self
+
+	def set_edge_style(self, indices, color=None, stroke_width=None):
+		super().set_edge_style(indices, color, stroke_width)
+		if color is not None:
+			self.tips.set_item_style(indices, fill_color=color, stroke_color=color)
+		return self
+
+	def remove_edges(self, indices):
+		self.tips.remove_items(indices)
+		return super().remove_edges(indices)
+
+	def get_edge_mobject(self, index):
+		return VGroup(super().get_edge_mobject(index), self.tips.get_item_mobject(index))
+
+	def set_edges_visible(self, indices, visible):
+		self.tips.set_item_style(indices, fill_opacity=float(visible))
+		return super().set_edges_visible(indices, visible)
+
+class VertexBatch(ShapeBatch):
+	def __init__(self, centers, radius=0.2, fill_color="#236B8E", fill_opacity=1, stroke_color=WHITE, stroke_width=4, **kwargs):
+		self.template = Circle(radius=radius).points
+		self.style = dict(fill_color=fill_color, fill_opacity=fill_opacity, stroke_color=stroke_color, stroke_width=stroke_width)
+		super().__init__(self.vertex_points(centers), self.style, **kwargs)
+
+	def vertex_points(self, centers):
+		return self.template[None, :, :] + np.asarray(centers, dtype=float).reshape(-1, 1, 3)
+
+	def add_vertices(self, centers):
+		return self.add_items(self.vertex_points(centers), self.style)
+
+	def remove_vertices(self, indices):
+		return self.remove_items(indices)
+
+	def get_vertex_mobject(self, index):
+		return self.get_item_mobject(index)
+
+	def set_vertices_visible(self, indices, visible):
+		return self.set_item_style(indices, fill_opacity=self.style["fill_opacity"] * visible, stroke_opacity=float(visible))
+
+	def get_centers(self):
+		return self.get_item_points().mean(axis=1)
+
+	def set_vertex_style(self, indices, **style):
+		return self.set_item_style(indices, **style)
+
+class FadeOutHighlight(FadeOut):
+	def __init__(self, layer, highlights, **kwargs):
+		super().__init__(layer, **kwargs)
+		self.highlights = highlights
+
+	def clean_up_from_scene(self, scene):
+		self.highlights.remove(self.mobject)
+		super().clean_up_from_scene(scene)
+
+class CreateStandIn(Create):
+	def __init__(self, stand_in, highlights, reveal, **kwargs):
+		super().__init__(stand_in, introducer=False, **kwargs)
+		self.highlights = highlights
+		self.reveal = reveal
+
+	def clean_up_from_scene(self, scene):
+		# the stand-in has been drawn over a hidden batch item, which now takes its place
+		self.highlights.remove(self.mobject)
+		self.reveal()
+		super().clean_up_from_scene(scene)
+
+class AffineTransform(Animation):
+	def __init__(self, mobject, matrix=np.identity(3), shift=ORIGIN, about_point=None, **kwargs):
+		self.matrix = np.asarray(matrix, dtype=float)
+		self.shift = np.asarray(shift, dtype=float)
+		self.about_point = about_point
+		super().__init__(mobject, **kwargs)
+
+	def begin(self):
+		# the whole family is packed into one point buffer that every submobject views,
+		# so a frame is a single matmul and no starting copy of the group is made
+		members = [mob for mob in self.mobject.get_family() if len(mob.points)]
+		about = self.mobject.get_center() if self.about_point is None else np.asarray(self.about_point, dtype=float)
+		self.about = about
+		self.relative_points = np.concatenate([mob.points for mob in members]) - about
+		self.buffer = np.empty_like(self.relative_points)
+		offset = 0
+		for mob in members:
+			mob.points = self.buffer[offset:offset + len(mob.points)]
+			offset += len(mob.points)
+		if self.suspend_mobject_updating:
+			self.mobject.suspend_updating()
+		self.interpolate(0)
+
+	def interpolate_mobject(self, alpha):
+		alpha = self.rate_func(alpha)
+		matrix = (1 - alpha) * np.identity(3) + alpha * self.matrix
+		np.matmul(self.relative_points, matrix.T, out=self.buffer)
+		self.buffer += self.about + alpha * self.shift
+
+	def finish(self):
+		super().finish()
+		for mob in self.mobject.get_family():
+			mob.points = mob.points.copy()
+		# mobjects that keep coordinates of their own, like MyGraph's layout, follow the map once it has played
+		track_affine = getattr(self.mobject, "track_affine", None)
+		if track_affine is not None:
+			track_affine(self.matrix, self.shift, self.about)
+
+	def get_all_mobjects(self):
+		return (self.mobject,)
 
 class MyGraph(VGroup):
-	def __init__(self, node_positions, edges, labels=None, directed=False, graph_shift=np.array([0, 0, 0]), scale_factor=0.5, vertex_radius=0.2, **kwargs):
+	def __init__(self, node_positions, edges, labels=None, directed=False, graph_shift=np.array([0, 0, 0]), scale_factor=0.5, vertex_radius=0.2, compact_edges=False, compact_vertices=False, duplicate_edges="merge", layout_seed=0, **kwargs):
 		super().__init__(**kwargs)
+		if not isinstance(node_positions, dict):
+			node_positions = auto_layout(node_positions, edges, seed=layout_seed)
 		self.node_positions = node_positions
-		self.edges = edges
 		self.labels = labels if labels is not None else {} 
 		self.directed = directed
 		self.graph_shift = graph_shift
 		self.scale_factor = scale_factor
+		# node_positions stay in layout coordinates; this affine map takes them to where the graph is drawn now
+		self.layout_matrix = scale_factor * np.identity(3)
+		self.layout_shift = np.asarray(graph_shift, dtype=float)
 		self.vertex_radius = vertex_radius
+		self.compact_edges = compact_edges
+		self.compact_vertices = compact_vertices
+		self.duplicate_edges = duplicate_edges
+		self.nodes = list(node_positions)
+		self.node_index = {node: i for i, node in enumerate(self.nodes)}
+		self.edges = self.resolve_duplicate_edges(edges)
+		self.build_adjacency()
 		self.vertices = VGroup()
 		self.edge_lines = VGroup()
+		self.vertex_circles = []
+		self.vertex_labels = {}
+		self.label_paths = None
+		self.label_point_counts = {}
+		self.highlights = VGroup()
 		self.create_edges()
 		self.create_vertices()
 		self.vertices.z_index = 2
 		self.edge_lines.z_index = 1
-		self.add(self.edge_lines, self.vertices)
+		self.add(self.edge_lines, self.highlights, self.vertices)
 
 	def create_vertices(self):
-		dark_blue = "#236B8E"
-		for node, pos in self.node_positions.items():
-			pos_with_shift = pos * self.scale_factor + self.graph_shift
-			vertex_circle = Circle(radius=self.vertex_radius, color=WHITE, fill_color=dark_blue, fill_opacity=1, stroke_color=WHITE, stroke_width=4).move_to(pos_with_shift)
-			self.vertices.add(vertex_circle)
-			if node in self.labels and self.labels[node]:
-				vertex_label = Text(self.labels[node], font_size=24, color=WHITE).move_to(pos_with_shift)
-				self.vertices.add(vertex_label)
+		if self.compact_vertices:
+			positions = self.get_positions()
+			self.vertex_batch = VertexBatch(positions, radius=self.vertex_radius, fill_color="#236B8E")
+			self.vertices.add(self.vertex_batch)
+			self.add_label_paths([(node, pos) for node, pos in zip(self.node_positions, positions) if self.labels.get(node)])
+			return
+		for node, pos in zip(self.node_positions, self.get_positions()):
+			self.create_vertex(node, pos)
+
+	def create_vertex(self, node, pos_with_shift):
+		vertex_circle = Circle(radius=self.vertex_radius, color=WHITE, fill_color="#236B8E", fill_opacity=1, stroke_color=WHITE, stroke_width=4).move_to(pos_with_shift)
+		self.vertices.add(vertex_circle)
+		self.vertex_circles.append(vertex_circle)
+		if node in self.labels and self.labels[node]:
+			vertex_label = cached_text(Text, self.labels[node], font_size=24, color=WHITE).move_to(pos_with_shift)
+			self.vertices.add(vertex_label)
+			self.vertex_labels[node] = vertex_label
+
+	def add_label_paths(self, labelled):
+		# all label glyphs share one fill, so they are merged into a single path and each node keeps the length of its slice
+		if not labelled:
+			return
+		label_points = [] if self.label_paths is None else [self.label_paths.points]
+		for node, pos in labelled:
+			glyphs = cached_text(Text, self.labels[node], font_size=24, color=WHITE).move_to(pos).family_members_with_points()
+			label_points.extend(glyph.points for glyph in glyphs)
+			self.label_point_counts[node] = sum(len(glyph.points) for glyph in glyphs)
+		if self.label_paths is None:
+			self.label_paths = VMobject(fill_color=WHITE, fill_opacity=1, stroke_width=0)
+			self.vertices.add(self.label_paths)
+		self.label_paths.set_points(np.concatenate(label_points))
+
+	def get_label_slice(self, node):
+		offset = 0
+		for other, count in self.label_point_counts.items():
+			if other == node:
+				return slice(offset, offset + count)
+			offset += count
+
+	def get_positions(self):
+		return np.array(list(self.node_positions.values()), dtype=float).reshape(-1, 3) @ self.layout_matrix.T + self.layout_shift
+
+	def track_affine(self, matrix, shift, about):
+		# called by AffineTransform once it has moved the drawn graph: x -> (x - about) @ matrix.T + about + shift
+		self.layout_matrix = matrix @ self.layout_matrix
+		self.layout_shift = (self.layout_shift - about) @ matrix.T + about + shift
+
+	def get_edge_lengths(self):
+		positions = self.get_positions()
+		edge_indices = self.get_edge_indices()
+		return np.linalg.norm(positions[edge_indices[:, 0]] - positions[edge_indices[:, 1]], axis=1)
+
+	def get_vertex_centers(self):
+		if self.compact_vertices:
+			return self.vertex_batch.get_centers()
+		return np.array([vertex_circle.get_center() for vertex_circle in self.vertex_circles]).reshape(-1, 3)
+
+	def get_edge_indices(self):
+		if self.edge_indices is None:
+			self.edge_indices = np.array([[self.node_index[start_node], self.node_index[end_node]] for start_node, end_node in self.edges], dtype=int).reshape(-1, 2)
+		return self.edge_indices
 
 	def create_edges(self):
+		if self.compact_edges:
+			positions = self.get_positions()
+			edge_indices = self.get_edge_indices()
+			batch = ArrowBatch if self.directed else EdgeBatch
+			self.edge_lines = batch(positions[edge_indices[:, 0]], positions[edge_indices[:, 1]])
+			return
+		positions = self.get_positions()
 		for start_node, end_node in self.edges:
-			start_pos = self.node_positions[start_node] * self.scale_factor + self.graph_shift
-			end_pos = self.node_positions[end_node] * self.scale_factor + self.graph_shift
+			self.edge_lines.add(self.create_edge_line(positions[self.node_index[start_node]], positions[self.node_index[end_node]]))
+
+	def create_edge_line(self, start_pos, end_pos):
+		if self.directed:
+			return Arrow(start=start_pos, end=end_pos, buff=0.1, stroke_width=DEFAULT_STROKE_WIDTH, color=GREY, max_tip_length_to_length_ratio=0.05)  # Adjust the arrowhead size if needed
+		return Line(start=start_pos, end=end_pos, stroke_width=DEFAULT_STROKE_WIDTH, color=GREY)
+
+	def edge_key(self, start_node, end_node):
+		return (start_node, end_node) if self.directed else frozenset((start_node, end_node))
+
+	def resolve_duplicate_edges(self, edges):
+		if self.duplicate_edges not in ("merge", "keep", "error"):
+			raise ValueError(f"duplicate_edges must be 'merge', 'keep' or 'error', not {self.duplicate_edges!r}")
+		self.edge_keys = set()
+		resolved = []
+		for edge in edges:
+			key = self.edge_key(*edge)
+			if key in self.edge_keys and self.duplicate_edges != "keep":
+				if self.duplicate_edges == "error":
+					raise ValueError(f"Duplicate edge {edge}")
+				logger.warning(f"MyGraph: dropping duplicate edge {edge}")
+				continue
+			self.edge_keys.add(key)
+			resolved.append(edge)
+		return resolved
+
+	def build_adjacency(self):
+		self.edge_indices = None
+		edge_indices = self.get_edge_indices()
+		self.out_degrees = np.bincount(edge_indices[:, 0], minlength=len(self.nodes))
+		self.in_degrees = np.bincount(edge_indices[:, 1], minlength=len(self.nodes))
+		self.degrees = self.out_degrees + self.in_degrees
+		self.adjacency_offsets = None
+
+	def get_adjacency(self):
+		# CSR layout: the neighbors of node i are adjacency_targets[adjacency_offsets[i]:adjacency_offsets[i + 1]],
+		# reached through edges adjacency_edges[...] (indices into self.edges)
+		if self.adjacency_offsets is None:
+			edge_indices = self.get_edge_indices()
+			edge_ids = np.arange(len(edge_indices))
 			if self.directed:
-				edge_line = Arrow(start=start_pos, end=end_pos, buff=0.1, stroke_width=DEFAULT_STROKE_WIDTH, color=GREY, max_tip_length_to_length_ratio=0.05)  # Adjust the arrowhead size if needed
+				sources, targets, ids = edge_indices[:, 0], edge_indices[:, 1], edge_ids
 			else:
-				edge_line = Line(start=start_pos, end=end_pos, stroke_width=DEFAULT_STROKE_WIDTH, color=GREY)
-			self.edge_lines.add(edge_line)
-class GraphTheory(Scene):
-	def construct(self):
+				sources = np.concatenate([edge_indices[:, 0], edge_indices[:, 1]])
+				targets = np.concatenate([edge_indices[:, 1], edge_indices[:, 0]])
+				ids = np.concatenate([edge_ids, edge_ids])
+			order = np.argsort(sources, kind="stable")
+			self.adjacency_offsets = np.concatenate([[0], np.cumsum(np.bincount(sources, minlength=len(self.nodes)))])
+			self.adjacency_targets = targets[order]
+			self.adjacency_edges = ids[order]
+		return self.adjacency_offsets, self.adjacency_targets, self.adjacency_edges
+
+	def degree(self, node):
+		return int(self.degrees[self.node_index[node]])
+
+	def neighbors(self, node):
+		offsets, targets, _ = self.get_adjacency()
+		i = self.node_index[node]
+		for j in targets[offsets[i]:offsets[i + 1]]:
+			yield self.nodes[j]
+
+	def odd_degree_nodes(self):
+		return [self.nodes[i] for i in np.flatnonzero(self.degrees % 2)]
+
+	def euler_path(self, start=None):
+		# Hierholzer's algorithm over the CSR adjacency, O(V + E); returns (nodes, edge ids) in traversal order
+		if self.directed:
+			balance = self.out_degrees - self.in_degrees
+			starts, ends = np.flatnonzero(balance == 1), np.flatnonzero(balance == -1)
+			unbalanced = np.flatnonzero(balance != 0)
+			if not (len(unbalanced) == 0 or (len(unbalanced) == 2 and len(starts) == 1 and len(ends) == 1)):
+				raise ValueError(f"No Euler path: unbalanced nodes {[self.nodes[i] for i in unbalanced]}")
+			candidates = starts
+		else:
+			candidates = np.flatnonzero(self.degrees % 2)
+			if len(candidates) not in (0, 2):
+				raise ValueError(f"No Euler path: odd-degree nodes {self.odd_degree_nodes()}")
+		if start is not None and len(candidates) and self.node_index[start] not in candidates:
+			raise ValueError(f"An Euler path has to start at one of {[self.nodes[i] for i in candidates]}")
+		if start is not None:
+			current = self.node_index[start]
+		elif len(candidates):
+			current = candidates[0]
+		else:
+			current = int(np.argmax(self.degrees > 0))
+		offsets, targets, edge_ids = self.get_adjacency()
+		used = np.zeros(len(self.edges), dtype=bool)
+		pointers = offsets[:-1].copy()
+		stack = [(current, -1)]
+		path = []
+		while stack:
+			node, _ = stack[-1]
+			while pointers[node] < offsets[node + 1] and used[edge_ids[pointers[node]]]:
+				pointers[node] += 1
+			if pointers[node] == offsets[node + 1]:
+				path.append(stack.pop())
+				continue
+			k = pointers[node]
+			used[edge_ids[k]] = True
+			stack.append((targets[k], edge_ids[k]))
+		if not used.all():
+			raise ValueError("No Euler path: the edges are not all connected")
+		path.reverse()
+		return [self.nodes[node] for node, _ in path], [int(edge) for _, edge in path[1:]]
+
+	def get_edge_points(self):
+		if isinstance(self.edge_lines, EdgeBatch):
+			return self.edge_lines.get_edge_points()
+		starts = np.array([edge_line.get_start() for edge_line in self.edge_lines]).reshape(-1, 3)
+		ends = np.array([edge_line.get_end() for edge_line in self.edge_lines]).reshape(-1, 3)
+		return line_points(starts, ends)
+
+	def path_edge_ids(self, nodes):
+		offsets, targets, edge_ids = self.get_adjacency()
+		used = set()
+		path_edges = []
+		for start_node, end_node in zip(nodes, nodes[1:]):
+			i, j = self.node_index[start_node], self.node_index[end_node]
+			candidates = edge_ids[offsets[i]:offsets[i + 1]][targets[offsets[i]:offsets[i + 1]] == j]
+			if not len(candidates):
+				raise ValueError(f"No edge from {start_node} to {end_node}")
+			unused = [edge for edge in candidates if edge not in used]
+			edge = int(unused[0] if unused else candidates[0])
+			used.add(edge)
+			path_edges.append(edge)
+		return path_edges
+
+	def highlight_edges(self, edge_ids, color=RED, stroke_width=10, reverse=None, all_edge_points=None):
+		# one VMobject whose segments are copied from the current edge geometry
+		edge_ids = np.asarray(edge_ids, dtype=int)
+		edge_points = (self.get_edge_points() if all_edge_points is None else all_edge_points)[edge_ids]
+		if reverse is not None:
+			edge_points[reverse] = edge_points[reverse, ::-1]
+		layer = VMobject(stroke_color=color, stroke_width=stroke_width)
+		layer.set_points(edge_points.reshape(-1, 3))
+		layer.edge_ids = edge_ids
+		return layer
+
+	def highlight_path(self, nodes, edge_ids=None, color=RED, stroke_width=10):
+		if edge_ids is None:
+			edge_ids = self.path_edge_ids(nodes)
+		reverse = self.get_edge_indices()[edge_ids, 0] != np.array([self.node_index[node] for node in nodes[:-1]], dtype=int)
+		return self.highlight_edges(edge_ids, color, stroke_width, reverse=reverse)
+
+	def highlight_frontier(self, frontier, color=YELLOW, stroke_width=8):
+		# Create() on the group draws one level after another (lag_ratio=1)
+		all_edge_points = self.get_edge_points()
+		return VGroup(*(self.highlight_edges(level, color, stroke_width, all_edge_points=all_edge_points) for level in frontier))
+
+	def create_highlight(self, layer, **kwargs):
+		# the layer lives inside the graph, between edges and vertices, so it follows every later transform of the graph
+		self.highlights.add(layer)
+		kwargs.setdefault("rate_func", linear)
+		return Create(layer, introducer=False, **kwargs)
+
+	def clear_highlight(self, layer, **kwargs):
+		return FadeOutHighlight(layer, self.highlights, **kwargs)
+
+	def move_and_scale(self, point, scale_factor=1, **kwargs):
+		# same end state as animate.move_to(point).scale(scale_factor), played as one affine map
+		center = self.get_center()
+		return AffineTransform(self, scale_factor * np.identity(3), np.asarray(point, dtype=float) - center, about_point=center, **kwargs)
+
+	def trace_back(self, source, target, parents, parent_edges):
+		if source != target and parent_edges[target] < 0:
+			raise ValueError(f"{self.nodes[target]} is not reachable from {self.nodes[source]}")
+		nodes, edge_ids = [target], []
+		while nodes[-1] != source:
+			edge_ids.append(int(parent_edges[nodes[-1]]))
+			nodes.append(int(parents[nodes[-1]]))
+		return [self.nodes[node] for node in reversed(nodes)], edge_ids[::-1]
+
+	def bfs(self, source, target):
+		# level-synchronous BFS: each level is expanded with array operations over the CSR slices of the whole frontier.
+		# Returns (nodes, edge ids, frontier) where frontier[k] holds the tree edges discovered at depth k + 1.
+		offsets, targets, edge_ids = self.get_adjacency()
+		source, target = self.node_index[source], self.node_index[target]
+		parents = np.full(len(self.nodes), -1)
+		parent_edges = np.full(len(self.nodes), -1)
+		visited = np.zeros(len(self.nodes), dtype=bool)
+		visited[source] = True
+		current = np.array([source])
+		frontier = []
+		while len(current) and not visited[target]:
+			starts = offsets[current]
+			counts = offsets[current + 1] - starts
+			entries = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts) + np.repeat(starts, counts)
+			owners = np.repeat(current, counts)
+			fresh = ~visited[targets[entries]]
+			found, first = np.unique(targets[entries][fresh], return_index=True)
+			visited[found] = True
+			parents[found] = owners[fresh][first]
+			parent_edges[found] = edge_ids[entries][fresh][first]
+			if len(found):
+				frontier.append(parent_edges[found])
+			current = found
+		return (*self.trace_back(source, target, parents, parent_edges), frontier)
+
+	def dijkstra(self, source, target, weights=None, frontier_batches=8):
+		# binary-heap Dijkstra over the CSR arrays; weights default to the edge lengths in the layout.
+		# Returns (nodes, edge ids, frontier) where frontier splits the settled tree edges into frontier_batches groups in settle order.
+		offsets, targets, edge_ids = self.get_adjacency()
+		weights = self.get_edge_lengths() if weights is None else np.asarray(weights, dtype=float)
+		if (weights < 0).any():
+			raise ValueError("Dijkstra needs non-negative edge weights")
+		entry_weights = weights[edge_ids].tolist()
+		offsets, targets, entry_edges = offsets.tolist(), targets.tolist(), edge_ids.tolist()
+		source, target = self.node_index[source], self.node_index[target]
+		distances = [np.inf] * len(self.nodes)
+		parents = [-1] * len(self.nodes)
+		parent_edges = [-1] * len(self.nodes)
+		settled = bytearray(len(self.nodes))
+		distances[source] = 0.0
+		heap = [(0.0, source)]
+		settle_order = []
+		while heap:
+			distance, node = heapq.heappop(heap)
+			if settled[node]:
+				continue
+			settled[node] = 1
+			if parent_edges[node] >= 0:
+				settle_order.append(parent_edges[node])
+			if node == target:
+				break
+			for k in range(offsets[node], offsets[node + 1]):
+				neighbor = targets[k]
+				candidate = distance + entry_weights[k]
+				if candidate < distances[neighbor]:
+					distances[neighbor] = candidate
+					parents[neighbor] = node
+					parent_edges[neighbor] = entry_edges[k]
+					heapq.heappush(heap, (candidate, neighbor))
+		frontier = [batch for batch in np.array_split(np.array(settle_order, dtype=int), max(1, frontier_batches)) if len(batch)]
+		return (*self.trace_back(source, target, parents, parent_edges), frontier)
+
+	def add_edge(self, start_node, end_node):
+		key = self.edge_key(start_node, end_node)
+		if key in self.edge_keys and self.duplicate_edges != "keep":
+			if self.duplicate_edges == "error":
+				raise ValueError(f"Duplicate edge {(start_node, end_node)}")
+			return self
+		self.edge_keys.add(key)
+		self.edges.append((start_node, end_node))
+		start, end = self.node_index[start_node], self.node_index[end_node]
+		self.out_degrees[start] += 1
+		self.in_degrees[end] += 1
+		self.degrees[start] += 1
+		self.degrees[end] += 1
+		# the CSR arrays are rebuilt lazily on the next neighbor query, degrees and edge indices stay current
+		if self.edge_indices is not None:
+			self.edge_indices = np.concatenate([self.edge_indices, [[start, end]]])
+		self.adjacency_offsets = None
+		centers = self.get_vertex_centers()
+		if isinstance(self.edge_lines, EdgeBatch):
+			self.edge_lines.add_edges(centers[[start]], centers[[end]])
+		else:
+			self.edge_lines.add(self.create_edge_line(centers[start], centers[end]))
+		return self
+
+	def remove_edges(self, edge_ids):
+		edge_ids = np.unique(np.asarray(edge_ids, dtype=int))
+		edge_indices = self.get_edge_indices()
+		removed = edge_indices[edge_ids]
+		np.subtract.at(self.out_degrees, removed[:, 0], 1)
+		np.subtract.at(self.in_degrees, removed[:, 1], 1)
+		np.subtract.at(self.degrees, removed.ravel(), 1)
+		removed_edges = [self.edges[edge] for edge in edge_ids]
+		if isinstance(self.edge_lines, EdgeBatch):
+			self.edge_lines.remove_edges(edge_ids)
+		else:
+			self.edge_lines.remove(*[self.edge_lines[edge] for edge in edge_ids])
+		keep = np.ones(len(self.edges), dtype=bool)
+		keep[edge_ids] = False
+		self.edges = [edge for edge, kept in zip(self.edges, keep) if kept]
+		self.edge_indices = edge_indices[keep]
+		self.adjacency_offsets = None
+		if self.duplicate_edges == "keep":
+			self.edge_keys = {self.edge_key(*edge) for edge in self.edges}
+		else:
+			self.edge_keys.difference_update(self.edge_key(*edge) for edge in removed_edges)
+		return self
+
+	def remove_edge(self, start_node, end_node):
+		return self.remove_edges(self.path_edge_ids([start_node, end_node]))
+
+	def add_node(self, node, point, label=None):
+		# point is where the vertex is drawn now; node_positions keeps it in the graph's own layout coordinates
+		if node in self.node_index:
+			raise ValueError(f"Node {node!r} already exists")
+		point = np.asarray(point, dtype=float)
+		self.nodes.append(node)
+		self.node_index[node] = len(self.nodes) - 1
+		self.node_positions[node] = np.linalg.solve(self.layout_matrix, point - self.layout_shift)
+		self.out_degrees = np.append(self.out_degrees, 0)
+		self.in_degrees = np.append(self.in_degrees, 0)
+		self.degrees = np.append(self.degrees, 0)
+		self.adjacency_offsets = None
+		if label:
+			self.labels[node] = label
+		if self.compact_vertices:
+			self.vertex_batch.add_vertices([point])
+			if label:
+				self.add_label_paths([(node, point)])
+		else:
+			self.create_vertex(node, point)
+		return self
+
+	def remove_node(self, node):
+		i = self.node_index[node]
+		self.remove_edges(np.flatnonzero((self.get_edge_indices() == i).any(axis=1)))
+		self.nodes.pop(i)
+		self.node_index = {other: k for k, other in enumerate(self.nodes)}
+		self.out_degrees = np.delete(self.out_degrees, i)
+		self.in_degrees = np.delete(self.in_degrees, i)
+		self.degrees = np.delete(self.degrees, i)
+		self.edge_indices -= self.edge_indices > i
+		self.adjacency_offsets = None
+		self.node_positions.pop(node)
+		self.labels.pop(node, None)
+		if self.compact_vertices:
+			self.vertex_batch.remove_vertices([i])
+			if node in self.label_point_counts:
+				self.label_paths.set_points(np.delete(self.label_paths.points, self.get_label_slice(node), axis=0))
+				self.label_point_counts.pop(node)
+		else:
+			self.vertices.remove(self.vertex_circles.pop(i))
+			if node in self.vertex_labels:
+				self.vertices.remove(self.vertex_labels.pop(node))
+		return self
+
+	def create_edge(self, start_node, end_node, **kwargs):
+		edge_count = len(self.edges)
+		self.add_edge(start_node, end_node)
+		if len(self.edges) == edge_count:
+			return Wait(kwargs.get("run_time", 1))
+		if not isinstance(self.edge_lines, EdgeBatch):
+			return Create(self.edge_lines[-1], introducer=False, **kwargs)
+		# a batch item cannot be drawn on its own, so it stays hidden while a copy is drawn over it
+		stand_in = self.edge_lines.get_edge_mobject(edge_count)
+		self.edge_lines.set_edges_visible([edge_count], False)
+		self.highlights.add(stand_in)
+		return CreateStandIn(stand_in, self.highlights, lambda: self.edge_lines.set_edges_visible([edge_count], True), **kwargs)
+
+	def clear_edge(self, start_node, end_node, **kwargs):
+		edge = self.path_edge_ids([start_node, end_node])[0]
+		layer = self.edge_lines.get_edge_mobject(edge) if isinstance(self.edge_lines, EdgeBatch) else self.edge_lines[edge]
+		self.remove_edges([edge])
+		self.highlights.add(layer)
+		return FadeOutHighlight(layer, self.highlights, **kwargs)
+
+	def create_node(self, node, point, label=None, **kwargs):
+		if not self.compact_vertices:
+			self.add_node(node, point, label)
+			return Create(VGroup(self.vertex_circles[-1], *([self.vertex_labels[node]] if node in self.vertex_labels else [])), introducer=False, **kwargs)
+		self.add_node(node, point)
+		i = self.node_index[node]
+		stand_in = VGroup(self.vertex_batch.get_vertex_mobject(i))
+		if label:
+			stand_in.add(cached_text(Text, label, font_size=24, color=WHITE).move_to(point))
+		self.vertex_batch.set_vertices_visible([i], False)
+		self.highlights.add(stand_in)
+
+		def reveal():
+			self.vertex_batch.set_vertices_visible([self.node_index[node]], True)
+			if label:
+				self.labels[node] = label
+				self.add_label_paths([(node, point)])
+		return CreateStandIn(stand_in, self.highlights, reveal, **kwargs)
+
+	def clear_node(self, node, **kwargs):
+		i = self.node_index[node]
+		incident = np.flatnonzero((self.get_edge_indices() == i).any(axis=1))
+		if isinstance(self.edge_lines, EdgeBatch):
+			layer = VGroup(*(self.edge_lines.get_edge_mobject(edge) for edge in incident))
+		else:
+			layer = VGroup(*(self.edge_lines[edge] for edge in incident))
+		if self.compact_vertices:
+			layer.add(self.vertex_batch.get_vertex_mobject(i))
+			if node in self.label_point_counts:
+				label = VMobject(fill_color=WHITE, fill_opacity=1, stroke_width=0)
+				label.set_points(self.label_paths.points[self.get_label_slice(node)])
+				layer.add(label)
+		else:
+			layer.add(self.vertex_circles[i], *([self.vertex_labels[node]] if node in self.vertex_labels else []))
+		self.remove_node(node)
+		self.highlights.add(layer)
+		return FadeOutHighlight(layer, self.highlights, **kwargs)
+
+class DegreeTable(VGroup):
+	def __init__(self, graph, header=None, text=None, max_rows=None, row_buff=0.25, cell_buff=0.15, column_buff=0.75, **text_kwargs):
+		super().__init__()
+		self.graph = graph
+		self.text = text or (lambda string: cached_text(MarkupText, string, **text_kwargs))
+		self.max_rows = max_rows
+		self.row_buff = row_buff
+		self.cell_buff = cell_buff
+		self.column_buff = column_buff
+		self.header = header
+		self.degrees = {node: graph.degree(node) for node in graph.nodes}
+		self.rows_by_node = {node: self.make_row(node, label) for node, label in zip(graph.nodes, self.row_labels(graph))}
+		self.rows = VGroup(*self.rows_by_node.values())
+		self.arrange_rows()
+		if header is not None:
+			self.add(header)
+		self.add(self.rows)
+
+	@staticmethod
+	def row_labels(graph):
+		return [f"Node {graph.labels.get(node) or i + 1}:" for i, node in enumerate(graph.nodes)]
+
+	@staticmethod
+	def cell_texts(graph):
+		# node labels first, then every degree value the table can show, so all cells can be prewarmed up front
+		return DegreeTable.row_labels(graph) + [str(degree) for degree in sorted({graph.degree(node) for node in graph.nodes})]
+
+	def make_row(self, node, label):
+		row = VGroup(self.text(label))
+		row.add(self.text(str(self.degrees[node])).next_to(row[0], RIGHT, buff=self.cell_buff, aligned_edge=DOWN))
+		return row
+
+	def arrange_rows(self):
+		# all rows are placed by one arrange call; long tables wrap into columns instead of running off the frame
+		rows = VGroup(*(self.rows_by_node[node] for node in self.graph.nodes if node in self.rows_by_node))
+		if self.max_rows and len(rows) > self.max_rows:
+			rows.arrange_in_grid(rows=self.max_rows, flow_order="dr", buff=(self.column_buff, self.row_buff))
+		else:
+			rows.arrange(DOWN, buff=self.row_buff)
+		if self.header is not None:
+			rows.next_to(self.header, DOWN, buff=self.row_buff)
+		return rows
+
+	def refresh(self, **kwargs):
+		# rows follow the graph: removed nodes fade out, new nodes are drawn, and the remaining rows move to their new
+		# places; only value cells whose degree changed are rendered again. The whole table is the animated group,
+		# so playing it does not pull rows out of the table in the scene.
+		animations = []
+		top = self.rows.get_top()
+		for node in [node for node in self.rows_by_node if node not in self.graph.node_index]:
+			del self.degrees[node]
+			# the row stays in the table while it fades and leaves it when the animation cleans up
+			animations.append(FadeOutHighlight(self.rows_by_node.pop(node), self.rows))
+		kept = dict(self.rows_by_node)
+		starts = {node: row.get_center() for node, row in kept.items()}
+		for node, label in zip(self.graph.nodes, self.row_labels(self.graph)):
+			if node not in self.rows_by_node:
+				self.degrees[node] = self.graph.degree(node)
+				self.rows_by_node[node] = self.make_row(node, label)
+				self.rows.add(self.rows_by_node[node])
+				# the row is already part of the table, so it is not introduced to the scene on its own
+				animations.append(Create(self.rows_by_node[node], introducer=False))
+		rows = self.arrange_rows()
+		if self.header is None:
+			rows.move_to(top, aligned_edge=UP)
+		for node, row in kept.items():
+			target = row.copy()
+			if self.graph.degree(node) != self.degrees[node]:
+				self.degrees[node] = self.graph.degree(node)
+				target.remove(target[1]).add(self.text(str(self.degrees[node])).next_to(target[0], RIGHT, buff=self.cell_buff, aligned_edge=DOWN))
+			elif np.allclose(row.get_center(), starts[node]):
+				continue
+			row.shift(starts[node] - row.get_center())
+			animations.append(Transform(row, target))
+		return AnimationGroup(*animations, group=self, **kwargs)
+
+	def reveal(self, nodes=None, row_time=0.25, header_time=None):
+		rows = [self.rows_by_node[node] for node in (self.graph.nodes if nodes is None else nodes)]
+		writes = [Write(row, run_time=row_time) for row in rows]
+		if header_time is not None and self.header is not None:
+			writes.insert(0, Write(self.header, run_time=header_time))
+		return Succession(*writes)
+
+SPEC_PATH = Path(__file__).with_name("graph_theory.json")
+TEXT_KINDS = {"Text": Text, "MarkupText": MarkupText, "Tex": Tex}
+# parsed specs and built graphs live for the whole process, so batch jobs on a reused worker share them
+LOADED_SPECS = {}
+SPEC_GRAPHS = {}
+
+def load_spec(path):
+	path = Path(path)
+	key = (str(path.resolve()), path.stat().st_mtime_ns)
+	if key not in LOADED_SPECS:
+		if path.suffix in (".yaml", ".yml"):
+			import yaml  # only YAML specs need PyYAML
+			LOADED_SPECS[key] = yaml.safe_load(path.read_text(encoding="utf-8"))
+		else:
+			LOADED_SPECS[key] = json.loads(path.read_text(encoding="utf-8"))
+	return LOADED_SPECS[key]
+
+def narration_specs(spec):
+	return {name: (TEXT_KINDS[entry["kind"]], entry["text"], {key: value for key, value in entry.items() if key not in ("kind", "text")}) for name, entry in spec["narration"].items()}
+
+def spec_graph(graph_spec):
+	# a graph is built once per distinct geometry and copied for every scene that asks for it
+	key = json.dumps(graph_spec, sort_keys=True)
+	if key not in SPEC_GRAPHS:
+		options = {name: value for name, value in graph_spec.items() if name not in ("nodes", "edges", "labels")}
+		if "graph_shift" in options:
+			options["graph_shift"] = np.array(options["graph_shift"])
+		node_positions = {node: np.array(position) for node, position in graph_spec["nodes"].items()}
+		SPEC_GRAPHS[key] = MyGraph(node_positions, [tuple(edge) for edge in graph_spec["edges"]], graph_spec.get("labels"), **options)
+	return SPEC_GRAPHS[key].copy()
+
+class GraphTheory(CheckpointScene):
+	frame_workers = os.cpu_count() or 1
+	sections = ("definition", "degree", "paths", "cycles", "euler_circuit", "euler_path", "euler_proof")
+	checkpoint_attributes = ("my_graph", "t7", "my_graph5")
+	captions = bool(os.environ.get("CAPTIONS"))
+	render_attributes = CheckpointScene.render_attributes + ("captions",)
+	spec_path = Path(os.environ.get("SCENE_SPEC", SPEC_PATH))
+	# the graphs and narration each section reads from the spec, besides its own entry under "sections"
+	section_uses = {
+		"definition": dict(graphs=("definition",), narration=("t2", "t21", "t2_2", "t21_2", "text_vertex", "text_edge", "t3", "t31")),
+		"degree": dict(narration=("t4", "t41", "t5")),
+		"paths": dict(narration=("t7", "t71", "t72", "t73", "t74", "t75")),
+		"cycles": dict(narration=("t76", "t77", "t78", "t79")),
+		"euler_circuit": dict(graphs=("euler_circuit",), narration=("t8", "t81", "t82", "t83", "t84", "t85", "t86")),
+		"euler_path": dict(graphs=("euler_path",), narration=("t10", "t16", "t17")),
+		"euler_proof": dict(narration=("t18", "t19", "t20", "t201", "t211", "t212", "t213", "ep_proof")),
+	}
+
+	@property
+	def spec(self):
+		return load_spec(self.spec_path)
+
+	@classmethod
+	def section_inputs(cls, name, attributes):
+		# only the spec entries that the sections up to this one declare, so a variant that rewords
+		# a late line or swaps one graph re-renders just the sections that can show the change
+		spec = load_spec(attributes.get("spec_path", cls.spec_path))
+		sections = cls.sections[:cls.sections.index(name) + 1]
+		uses = [cls.section_uses.get(section, {}) for section in sections]
+		narration = sorted({key for use in uses for key in use.get("narration", ())})
+		graphs = sorted({key for use in uses for key in use.get("graphs", ())})
+		examples = [(section, spec.get("sections", {}).get(section)) for section in sections]
+		return [(key, spec["narration"][key]) for key in narration], [(key, spec["graphs"][key]) for key in graphs], examples
+
+	def graph(self, name):
+		self.graphs_read.add(name)
+		return spec_graph(self.spec["graphs"][name])
+
+	def section_spec(self, name):
+		return self.spec.get("sections", {}).get(name, {})
+
+	@staticmethod
+	def odd_pair(graph):
+		# the Euler path sections walk between the two odd-degree nodes, so a spec graph has to have exactly two
+		odd = graph.odd_degree_nodes()
+		if len(odd) != 2:
+			raise ValueError(f"An Euler path graph needs exactly two odd-degree nodes, got {odd}")
+		return odd
+
+	def save_checkpoint(self, name):
+		# a spec entry a section reads without declaring it would leave its cached video in place when the entry changes
+		declared = self.section_uses.get(name, {})
+		narration = self.narration.requested & self.spec["narration"].keys()
+		undeclared = sorted(narration - set(declared.get("narration", ()))) + sorted(self.graphs_read - set(declared.get("graphs", ())))
+		self.narration.requested.clear()
+		self.graphs_read.clear()
+		if undeclared:
+			raise ValueError(f"Section {name!r} reads spec entries missing from section_uses: {undeclared}")
+		super().save_checkpoint(name)
+
+	def table_text(self, graph, prefix, font_size):
+		# cells the table starts with are prewarmed now; degree values that only show up after edits are queued on first use
+		spec = lambda text: (MarkupText, text, dict(font="Lucida Console", font_size=font_size))
+		self.narration.submit({f"{prefix} {text}": spec(text) for text in DegreeTable.cell_texts(graph)})
+		return lambda text: self.narration.issue(f"{prefix} {text}", spec(text))
+
+	def setup(self):
+		# under render_batch frame_workers is this section's share of the cores, so concurrent sections don't each start a full pool
+		self.narration = NarrationPool(narration_specs(self.spec), max_workers=self.frame_workers, captions=self.captions)
+		self.graphs_read = set()
+		self.released_narration = []
+		self.caption_starts = {}
+		self.caption_cues = []
+
+	def tear_down(self):
+		self.narration.shutdown()
+		if self.captions:
+			self.end_captions(*self.caption_starts)
+			# the srt track is written by the file writer from its subcaptions, the WebVTT one next to it
+			subcaption_file = self.renderer.file_writer.output_plan.subcaption_file
+			if subcaption_file is not None and self.caption_cues:
+				write_vtt(subcaption_file.with_suffix(".vtt"), self.caption_cues)
+
+	def end_captions(self, *captions):
+		for caption in captions:
+			start = self.caption_starts.pop(caption)
+			end = self.renderer.time
+			self.caption_cues.append((start, end, caption.markup))
+			subcaptions = self.renderer.file_writer.subcaptions
+			subcaptions.append(srt.Subtitle(index=len(subcaptions), start=datetime.timedelta(seconds=float(start)), end=datetime.timedelta(seconds=float(end)), content=srt_caption(caption.markup)))
+
+	def add(self, *mobjects):
+		super().add(*mobjects)
+		# a caption is shown from the play that introduces it until the play that removes it
+		for mobject in mobjects:
+			for member in mobject.get_family():
+				if isinstance(member, CaptionText) and member not in self.caption_starts:
+					self.caption_starts[member] = self.renderer.time if self.play_start_time is None else self.play_start_time
+		return self
+
+	def profile_counters(self):
+		return dict(self.narration.seconds)
+
+	def section_captions(self):
+		# captions that were still up are closed by tear_down at the final time
+		return [(max(start, self.section_start) - self.section_start, None if end >= self.renderer.time else end - self.section_start, markup) for start, end, markup in self.caption_cues if end > self.section_start]
+
+	def remove(self, *mobjects):
+		super().remove(*mobjects)
+		self.released_narration.extend(member for mobject in mobjects for member in mobject.get_family() if member in self.narration.issued)
+		self.end_captions(*(member for mobject in mobjects for member in mobject.get_family() if member in self.caption_starts))
+		return self
+
+	def after_play(self):
+		# narration that left the scene is recycled only once the play that removed it has cleaned up
+		released = [text for text in self.released_narration if text not in self.mobjects]
+		self.released_narration.clear()
+		self.narration.release(*released)
+
+	def section_definition(self):
 		# axes = Axes(
 		# 	x_range=np.array([-10, 10, 1]),
 		# 	y_range=np.array([-6, 6, 1]),
@@ -49,66 +1981,16 @@ class GraphTheory(Scene):
 		# )
 
 		# self.add(axes)
-		node_positions = {
-			"A": np.array([-5, -1, 0]), 
-			"B": np.array([-4, 3, 0]), 
-			"C": np.array([-1, 4, 0]), 
-			"D": np.array([-2, 1, 0]),
-			"E": np.array([1, 2, 0]),
-			"F": np.array([1.5, 4.5, 0]),
-		}
-		edges = [
-			("A", "B"),
-			("B", "C"),
-			("D", "C"),
-			("C", "E"),
-			("C", "F"),
-			("F", "E"),
-			("E", "D"),
-			("D", "B")
-		]
-		labels = {
-			"A": "1", 
-			"B": "2", 
-			"C": "3", 
-			"D": "4",
-			"E": "5",
-			"F": "6",
-		}
-		shift = np.array([-0.9, 1.3, 0])
-		my_graph = MyGraph(node_positions, edges, labels, graph_shift=shift)
+		my_graph = self.graph("definition")
+		example = self.section_spec("definition")
 
 		self.play(Create(my_graph.vertices), run_time=1)
 		self.play(Create(my_graph.edge_lines), run_time=1)
 		self.wait(0.5)
-		t2 = MarkupText(
-			f"""
-				A <span fgcolor="{RED}">graph</span> is a mathematical structure that visualizes
-			""",
-			font="Lucida Console",
-			font_size=30
-		).move_to([0, 0, 0])
-		t21 = MarkupText(
-			f"""
-				<span fgcolor="{BLUE}">connections</span> between various <span fgcolor="{GREEN}">components</span>.
-			""",
-			font="Lucida Console",
-			font_size=30
-		).next_to(t2, DOWN, buff=0)
-		t2_2 = MarkupText(
-			f"""
-				These components are called <span fgcolor="{GREEN}">nodes (or vertices)</span>
-			""",
-			font="Lucida Console",
-			font_size=30
-		).next_to(t2, DOWN * 1.5, buff=0.6)
-		t21_2 = MarkupText(
-			f"""
-				and the connections between them are called <span fgcolor="{BLUE}">edges</span>.
-			""",
-			font="Lucida Console",
-			font_size=30
-		).next_to(t2_2, DOWN, buff=0)
+		t2 = self.narration["t2"].move_to([0, 0, 0])
+		t21 = self.narration["t21"].next_to(t2, DOWN, buff=0)
+		t2_2 = self.narration["t2_2"].next_to(t2, DOWN * 1.5, buff=0.6)
+		t21_2 = self.narration["t21_2"].next_to(t2_2, DOWN, buff=0)
 		self.play(Write(t2), run_time=2.5)
 		self.play(Write(t21), run_time=2.5)
 		self.wait(0.5)
@@ -116,358 +1998,131 @@ class GraphTheory(Scene):
 		self.play(Write(t21_2), run_time=2.5)
 
 		self.play(FadeOut(t2), FadeOut(t21), FadeOut(t2_2), FadeOut(t21_2), run_time=0.5)
-		self.play(my_graph.animate.move_to(ORIGIN).scale(1.5), run_time=0.75)
+		self.play(my_graph.move_and_scale(ORIGIN, 1.5), run_time=0.75)
+		centers = my_graph.get_vertex_centers()
+		vertex_center = centers[my_graph.node_index[example["vertex"]]]
+		edge_center = centers[[my_graph.node_index[node] for node in example["edge"]]].mean(axis=0)
+		arrow_to_vertex = Arrow(vertex_center + np.array([-2.3, 1.05, 0]), vertex_center + np.array([-0.3, 0.05, 0]), buff=0.1, color=RED)
+		text_vertex = self.narration["text_vertex"].next_to(arrow_to_vertex, LEFT)
 		
-		
-		arrow_to_vertex = Arrow(np.array([-4, 2, 0]), np.array([-2, 1, 0]), buff=0.1, color=RED)
-		text_vertex = Text("Node/Vertex", font="Lucida Console", font_size=30).next_to(arrow_to_vertex, LEFT)
-		
-		arrow_to_edge = Arrow(np.array([3, -2, 0]), np.array([1, -0.25, 0]), buff=0.1, color=GREEN)
-		text_edge = Text("Edge", font="Lucida Console", font_size=30).next_to(arrow_to_edge, RIGHT)
+		arrow_to_edge = Arrow(edge_center + np.array([2.05, -1.8, 0]), edge_center + np.array([0.05, -0.05, 0]), buff=0.1, color=GREEN)
+		text_edge = self.narration["text_edge"].next_to(arrow_to_edge, RIGHT)
 		self.play(GrowArrow(arrow_to_vertex), Write(text_vertex))
-		vertex_highlight = Circle(radius=0.314, color=RED, stroke_width=9).move_to(np.array([-1.69, 0.94, 0]))
+		vertex_highlight = Circle(radius=0.314, color=RED, stroke_width=9).move_to(vertex_center)
 		self.play(Create(vertex_highlight), run_time=1)
 		self.wait(0.5)
 		
 		self.play(GrowArrow(arrow_to_edge), Write(text_edge))
-		edge_highlight = Line(np.array([0, -0.47, 0]), np.array([2, 0.2, 0]), color=GREEN, stroke_width=8)
-		self.play(Create(edge_highlight), run_time=0.5)
+		edge_highlight = my_graph.highlight_path(example["edge"], color=GREEN, stroke_width=8)
+		self.play(my_graph.create_highlight(edge_highlight), run_time=0.5)
 		self.wait(0.5)
-		self.play(FadeOut(vertex_highlight), FadeOut(edge_highlight), FadeOut(arrow_to_vertex), FadeOut(text_vertex), FadeOut(arrow_to_edge), FadeOut(text_edge))
-		self.play(my_graph.animate.move_to(np.array([0, 2, 0])).scale(0.5))
-		t3 = MarkupText(
-			f"""
-				<span fgcolor="{GREEN}">Graph Theory</span> allows us to analyze and model complex
-			""",
-			font="Lucida Console",
-			font_size=30
-		).move_to(ORIGIN)
-		t31 = MarkupText(
-			f"""
-				<span fgcolor="{BLUE}">interconnected systems</span> across different fields.
-			""",
-			font="Lucida Console",
-			font_size=30
-		).next_to(t3, DOWN, buff=0)
+		self.play(FadeOut(vertex_highlight), my_graph.clear_highlight(edge_highlight), FadeOut(arrow_to_vertex), FadeOut(text_vertex), FadeOut(arrow_to_edge), FadeOut(text_edge))
+		self.play(my_graph.move_and_scale(np.array([0, 2, 0]), 0.5))
+		t3 = self.narration["t3"].move_to(ORIGIN)
+		t31 = self.narration["t31"].next_to(t3, DOWN, buff=0)
 		self.play(Write(t3), run_time=3.5)
 		self.play(Write(t31), run_time=3.5)
 
 		self.wait(3)
 		self.play(FadeOut(t3), FadeOut(t31), run_time=0.25)
+		self.my_graph = my_graph
+
+	def section_degree(self):
+		my_graph = self.my_graph
+		table_text = self.table_text(my_graph, "t5", 25)
 		
-		self.play(my_graph.animate.move_to(ORIGIN).scale(1.5), run_time=1)
+		self.play(my_graph.move_and_scale(ORIGIN, 1.5), run_time=1)
 		self.wait(5)
-		t4 = MarkupText(
-			f"""
-				<span fgcolor="{GREEN}">The degree</span> of a node.
-			""",
-			font="Lucida Console",
-			font_size=30
-		).next_to(my_graph, DOWN, buff=0.5)
-		t41 = MarkupText(
-			f"""
-				Which is simply the <span fgcolor="{BLUE}">number of edges</span> connected to <span fgcolor="{YELLOW}">a single node</span>.
-			""",
-			font="Lucida Console",
-			font_size=25
-		).next_to(t4, DOWN)
+		t4 = self.narration["t4"].next_to(my_graph, DOWN, buff=0.5)
+		t41 = self.narration["t41"].next_to(t4, DOWN)
 		self.play(Write(t4), run_time=1.5)
 		self.play(Write(t41), run_time=3)
 		self.wait(0.5)
 		self.play(FadeOut(t4), FadeOut(t41), run_time=0.5)
 		self.wait(2)
-		edge_highlight2 = Line(np.array([-1.3, 0.75, 2.5]),np.array([0, -0.47, 2.5]), color=GREEN, stroke_width=10)
-		self.play(Create(edge_highlight2), run_time=0.5)
-		edge_highlight3 = Line(np.array([-1.3, 0.75, 2.5]),np.array([-1.77, -1.5, 2.5]), color=GREEN, stroke_width=10)
-		self.play(Create(edge_highlight3), run_time=0.5)
-		edge_highlight4 = Line(np.array([-1.3, 0.75, 2.5]),np.array([0.5, 1.35, 2.5]), color=GREEN, stroke_width=10)
-		self.play(Create(edge_highlight4), run_time=0.5)
+		node = self.section_spec("degree")["node"]
+		degree_highlights = [my_graph.highlight_path([node, neighbor], color=GREEN, stroke_width=10) for neighbor in my_graph.neighbors(node)]
+		for edge_highlight in degree_highlights:
+			self.play(my_graph.create_highlight(edge_highlight), run_time=0.5)
 		self.wait(2)
-		t5 = MarkupText(
-			f"""
-				Degrees of nodes:
-			""",
-			font="Lucida Console",
-			font_size=25
-		).move_to(np.array([4, -0.5, 0]))
-		t51 = MarkupText(
-			f"""
-				Node 1: 1
-			""",
-			font="Lucida Console",
-			font_size=25
-		).next_to(t5, DOWN, buff=0.25)
-		t52 = MarkupText(
-			f"""
-				Node 2: 3
-			""",
-			font="Lucida Console",
-			font_size=25
-		).next_to(t51, DOWN)
-		t53 = MarkupText(
-			f"""
-				Node 3: 4
-			""",
-			font="Lucida Console",
-			font_size=25
-		).next_to(t52, DOWN)
-		t54 = MarkupText(
-			f"""
-				Node 4: 3
-			""",
-			font="Lucida Console",
-			font_size=25
-		).next_to(t53, DOWN)
-		t55 = MarkupText(
-			f"""
-				Node 5: 3
-			""",
-			font="Lucida Console",
-			font_size=25
-		).next_to(t54, DOWN)
-		t56 = MarkupText(
-			f"""
-				Node 6: 2
-			""",
-			font="Lucida Console",
-			font_size=25
-		).next_to(t55, DOWN)
-		self.play(Write(t5), run_time=0.25)
-		self.play(Write(t52), run_time=0.5)
+		degree_table = DegreeTable(my_graph, header=self.narration["t5"], text=table_text)
+		degree_table.shift(np.array([4, -0.5, 0]) - degree_table.header.get_center())
+		self.play(degree_table.reveal([node], row_time=0.5, header_time=0.25))
 		self.wait(1.5)
-		self.play(Write(t51), run_time=0.25)
-		self.play(Write(t53), run_time=0.25)
-		self.play(Write(t54), run_time=0.25)
-		self.play(Write(t55), run_time=0.25)
-		self.play(Write(t56), run_time=0.25)
+		self.play(degree_table.reveal([other for other in my_graph.nodes if other != node]))
 		self.wait(3)
-		self.play(FadeOut(t5), FadeOut(t51), FadeOut(t52), FadeOut(t53), FadeOut(t54), FadeOut(t55), FadeOut(t56), FadeOut(edge_highlight2), FadeOut(edge_highlight3), FadeOut(edge_highlight4), run_time=0.5)
+		self.play(FadeOut(degree_table), *(my_graph.clear_highlight(edge_highlight) for edge_highlight in degree_highlights), run_time=0.5)
 		self.wait(3)
-		t7 = Text("Paths in a graph", font="Lucida Console", font_size=35).to_edge(UP, buff=0.2)
+
+	def section_paths(self):
+		my_graph = self.my_graph
+		t7 = self.narration["t7"].to_edge(UP, buff=0.2)
 		self.play(Write(t7))
-		self.play(my_graph.animate.move_to(np.array([0, 1, 0])), run_time=0.5)
-
-		t71 = MarkupText(
-			f"""
-			A <span fgcolor="{BLUE}">path</span> leads from a node to another through edges of the graph.
-			""",
-			font="Lucida Console",
-			font_size=25
-		).next_to(my_graph, DOWN, buff=0.2)
-		t72 = MarkupText(
-			f"""
-			The <span fgcolor="{GREEN}">length</span> of a path is the number of edges it contains.
-			""",
-			font="Lucida Console",
-			font_size=25
-		).next_to(t71, DOWN, buff=0.2)
+		self.play(my_graph.move_and_scale(np.array([0, 1, 0])), run_time=0.5)
+
+		t71 = self.narration["t71"].next_to(my_graph, DOWN, buff=0.2)
+		t72 = self.narration["t72"].next_to(t71, DOWN, buff=0.2)
 		self.play(Write(t71), run_time=3)
 		self.wait(0.5)
 		self.play(Write(t72), run_time=3.5)
-		edge_highlight5 = Line(np.array([-1.77, -1.5+1, 2.5]), np.array([-1.3, 0.75+1, 2.5]), color=GREEN, stroke_width=10)
-		edge_highlight6 = Line(np.array([-1.3, 0.75+1, 2.5]), np.array([0, -0.47+1, 2.5]), color=GREEN, stroke_width=10)
-		edge_highlight7 = Line(np.array([0, -0.47+1, 0]), np.array([1.5, 0.2+1, 0]), color=GREEN, stroke_width=8)
+		path_highlight = my_graph.highlight_path(self.section_spec("paths")["path"], color=GREEN, stroke_width=10)
 		self.wait(0.5)
-		self.play(Create(edge_highlight5), run_time=0.5)
-		self.play(Create(edge_highlight6), run_time=0.5)
-		self.play(Create(edge_highlight7), run_time=0.5)
-		t73 = MarkupText(
-			f"""
-			One path of this graph is:
-			""",
-			font="Lucida Console",
-			font_size=25
-		).next_to(t72, DOWN, buff=0.2)
-		t74 = MarkupText(
-			f"""
-			<span fgcolor="{BLUE}">1 -> 2 -> 4 -> 5</span>
-			""",
-			font="Lucida Console",
-			font_size=25
-		).next_to(t73, DOWN, buff=0.2)
-		t75 = MarkupText(
-			f"""
-			Its length is <span fgcolor="{GREEN}">3</span>.
-			""",
-			font="Lucida Console",
-			font_size=25
-		).next_to(t74, DOWN, buff=0.2)
+		self.play(my_graph.create_highlight(path_highlight), run_time=1.5)
+		t73 = self.narration["t73"].next_to(t72, DOWN, buff=0.2)
+		t74 = self.narration["t74"].next_to(t73, DOWN, buff=0.2)
+		t75 = self.narration["t75"].next_to(t74, DOWN, buff=0.2)
 		self.play(Write(t73))
 		self.play(Write(t74),run_time=1)
 		self.play(Write(t75))
 		self.wait(2)
-		self.play(FadeOut(t71), FadeOut(t72), FadeOut(t73), FadeOut(t74), FadeOut(t75), FadeOut(edge_highlight5), FadeOut(edge_highlight6), FadeOut(edge_highlight7), run_time=0.5)
-		t76 = MarkupText(
-			f"""
-			A <span fgcolor="{RED}">cycle</span> is a path that starts and ends at the same node.
-			""",
-			font="Lucida Console",
-			font_size=25
-		).next_to(my_graph, DOWN, buff=0.2)
-		edge_highlight8 = Line(np.array([-1.3, 0.75+1, 2.5]),np.array([0.5, 1.35+1, 2.5]), color=RED, stroke_width=10)
-		edge_highlight11 = Line(np.array([0, -0.47+1, 2.5]), np.array([-1.3, 0.75+1, 2.5]), color=RED, stroke_width=10)
-		edge_highlight10 = Line(np.array([1.5, 0.2+1, 0]),np.array([0, -0.47+1, 0]), color=RED, stroke_width=8)
-		edge_highlight9 = Line(np.array([0.45, 1.35+1, 2.5]), np.array([1.5, 0.2+1, 0]), color=RED, stroke_width=8)
+		self.play(FadeOut(t71), FadeOut(t72), FadeOut(t73), FadeOut(t74), FadeOut(t75), my_graph.clear_highlight(path_highlight), run_time=0.5)
+		self.t7 = t7
+
+	def section_cycles(self):
+		my_graph, t7 = self.my_graph, self.t7
+		t76 = self.narration["t76"].next_to(my_graph, DOWN, buff=0.2)
+		cycle_highlight = my_graph.highlight_path(self.section_spec("cycles")["cycle"], color=RED, stroke_width=10)
 		self.play(Write(t76), run_time=4)
-		self.play(Create(edge_highlight8), run_time=0.5)
-		self.play(Create(edge_highlight9), run_time=0.5)
-		self.play(Create(edge_highlight10), run_time=0.5)
-		self.play(Create(edge_highlight11), run_time=0.5)
+		self.play(my_graph.create_highlight(cycle_highlight), run_time=2)
 		
-		t77 = MarkupText(
-			f"""
-			One cycle of this graph is:
-			""",
-			font="Lucida Console",
-			font_size=25
-		).next_to(t76, DOWN, buff=0.2)
-		t78 = MarkupText(
-			f"""
-			<span fgcolor="{BLUE}">2 -> 3 -> 5 -> 4 -> 2</span>
-			""",
-			font="Lucida Console",
-			font_size=25
-		).next_to(t77, DOWN, buff=0.2)
-		t79 = MarkupText(
-			f"""
-			Its length is <span fgcolor="{GREEN}">4</span>.
-			""",
-			font="Lucida Console",
-			font_size=25
-		).next_to(t78, DOWN, buff=0.2)
+		t77 = self.narration["t77"].next_to(t76, DOWN, buff=0.2)
+		t78 = self.narration["t78"].next_to(t77, DOWN, buff=0.2)
+		t79 = self.narration["t79"].next_to(t78, DOWN, buff=0.2)
 		self.play(Write(t77), run_time=0.75)
 		self.play(Write(t78), run_time=0.75)
 		self.play(Write(t79), run_time=0.75)
 		self.wait(2)
-		self.play(FadeOut(t7), FadeOut(t76), FadeOut(t77), FadeOut(t78), FadeOut(t79), FadeOut(my_graph), FadeOut(edge_highlight8), FadeOut(edge_highlight9), FadeOut(edge_highlight10), FadeOut(edge_highlight11), run_time=0.5)
-		
-		node_positions3 = {
-			"A": np.array([0*2, 0*2, 0]), 
-			"B": np.array([-1*2, 0*2, 0]), 
-			"C": np.array([1*2, 0*2, 0]), 
-			"D": np.array([2*2, 0*2, 0]),
-			"E": np.array([1*2, 1*2, 0]),
-			"F": np.array([0*2, 1*2, 0]),
-			"G": np.array([0*2, -1*2, 0]),
-			"H": np.array([1*2, -1*2, 0]),
-		}
-		edges3 = [
-			("A", "B"),
-			("A", "G"),
-			("A", "F"),
-			("A", "H"),
-			("B", "F"),
-			("A", "H"),
-			("C", "D"),
-			("C", "E"),
-			("C", "F"),
-			("C", "H"),
-			("D", "H"),
-			("E", "F"),
-			("G", "H"),
-		]
-		labels3 = {
-			"A": "8", 
-			"B": "1", 
-			"C": "4", 
-			"D": "5",
-			"E": "3",
-			"F": "2",
-			"G": "7",
-			"H": "6",
-		}
-		my_graph4 = MyGraph(node_positions3, edges3, labels3, vertex_radius=0.2)
+		self.play(FadeOut(t7), FadeOut(t76), FadeOut(t77), FadeOut(t78), FadeOut(t79), FadeOut(my_graph), run_time=0.5)
+
+	def section_euler_circuit(self):
+		my_graph4 = self.graph("euler_circuit")
 		self.play(Create(my_graph4.vertices), run_time=1)
 		self.play(Create(my_graph4.edge_lines), run_time=1)
-		self.play(my_graph4.animate.move_to(UP).scale(0.75), run_time=0.5)
+		self.play(my_graph4.move_and_scale(UP, 0.75), run_time=0.5)
 
 		self.wait(7)
 
-		t8 = MarkupText(
-			f"""
-			An <span fgcolor="{RED}">Euler Circuit</span> is a cycle that visits every node in the graph
-			""",
-			font="Lucida Console",
-			font_size=25
-		).next_to(my_graph4, DOWN, buff=0.5)
-		t81 = MarkupText(
-			f"""
-			using each edge <span fgcolor="{YELLOW}">exactly once</span>.
-			""",
-			font="Lucida Console",
-			font_size=25
-		).next_to(t8, DOWN, buff=0.2)
+		t8 = self.narration["t8"].next_to(my_graph4, DOWN, buff=0.5)
+		t81 = self.narration["t81"].next_to(t8, DOWN, buff=0.2)
 		self.wait(2.5)
 		self.play(Write(t8), run_time=4)
 		self.play(Write(t81), run_time=2)
 		self.wait(0.5)
 		self.play(FadeOut(t8), FadeOut(t81))
-		self.play(my_graph4.animate.move_to(ORIGIN).scale(2), run_time=0.5)
+		self.play(my_graph4.move_and_scale(ORIGIN, 2), run_time=0.5)
 		self.wait(0.5)
-		edge_highlight12 = Line(np.array([-1*2-0.25, 0*2, 0]), np.array([0*2-0.75, 1*2-0.5, 0]), color=RED, stroke_width=10)
-		edge_highlight13 = Line(np.array([0*2-1, 1*2-0.5, 0]), np.array([1*2-1, 1*2-0.5, 0]), color=RED, stroke_width=10)
-		edge_highlight14 = Line(np.array([1*2-1.25, 1*2-0.3, 0]), np.array([1*2-1.25, 0*2+0.3, 0]), color=RED, stroke_width=10)
-		edge_highlight15 = Line(np.array([1*2-1, 0*2, 0]), np.array([2*2-1.75, 0*2, 0]), color=RED, stroke_width=10)
-		edge_highlight16 = Line(np.array([1*2+0.25, 0*2, 0]), np.array([0*2+0.75, -1*2+0.5, 0]), color=RED, stroke_width=10)
-		edge_highlight17 = Line(np.array([0*2+1, -1*2+0.5, 0]), np.array([-1*2+1, -1*2+0.5, 0]), color=RED, stroke_width=10)
-		edge_highlight18 = Line(np.array([-1*2+1.25, -1*2+0.3, 0]), np.array([-1*2+1.25, 0*2-0.3, 0]), color=RED, stroke_width=10)
-		edge_highlight19 = Line(np.array([-0.5*2+0.25, 0*2, 0]), np.array([0*2+0.75, -1*2+0.5, 0]), color=RED, stroke_width=10)
-		edge_highlight20 = Line(np.array([1*2-1.25, -1*2+0.3, 0]), np.array([1*2-1.25, 0*2+0.3, 0]), color=RED, stroke_width=10)
-		edge_highlight21 = Line(np.array([0.5*2-0.25, 0*2, 0]), np.array([0*2-0.75, 1*2-0.5, 0]), color=RED, stroke_width=10)
-		edge_highlight22 = Line(np.array([-1*2+1.25, 1*2-0.3, 0]), np.array([-1*2+1.25, 0*2+0.3, 0]), color=RED, stroke_width=10)
-		edge_highlight23 = Line(np.array([-1*2+1, 0*2, 0]), np.array([-2*2+1.75, 0*2, 0]), color=RED, stroke_width=10)
-
-
-		self.play(Create(edge_highlight12), run_time=0.75)
-		self.play(Create(edge_highlight13), run_time=0.75)
-		self.play(Create(edge_highlight14), run_time=0.75)
-		self.play(Create(edge_highlight15), run_time=0.75)
-		self.play(Create(edge_highlight16), run_time=0.75)
-		self.play(Create(edge_highlight17), run_time=0.75)
-		self.play(Create(edge_highlight18), run_time=0.75)
-		self.play(Create(edge_highlight19), run_time=0.75)
-		self.play(Create(edge_highlight20), run_time=0.75)
-		self.play(Create(edge_highlight21), run_time=0.75)
-		self.play(Create(edge_highlight22), run_time=0.75)
-		self.play(Create(edge_highlight23), run_time=0.75)
-		graphandhighlight = VGroup(my_graph4, edge_highlight12, edge_highlight13, edge_highlight14, edge_highlight15, edge_highlight16, edge_highlight17, edge_highlight18, edge_highlight19, edge_highlight20, edge_highlight21, edge_highlight22, edge_highlight23)
+		if my_graph4.odd_degree_nodes():
+			raise ValueError(f"An Euler circuit graph needs even degrees everywhere, got odd nodes {my_graph4.odd_degree_nodes()}")
+		euler_circuit, circuit_edges = my_graph4.euler_path(start=self.section_spec("euler_circuit").get("start"))
+		circuit_highlight = my_graph4.highlight_path(euler_circuit, circuit_edges, color=RED, stroke_width=10)
+		self.play(my_graph4.create_highlight(circuit_highlight), run_time=0.75 * len(circuit_edges))
 		self.wait(1.7)	
-		self.play(graphandhighlight.animate.move_to(UP).scale(0.75), run_time=0.5)
-		t82 = MarkupText(
-			f"""
-			We can say that the edges connected to a node can be split into 2 parts
-			""",
-			font="Lucida Console",
-			font_size=20
-		).next_to(my_graph4, DOWN, buff=0.5)
-		t83 = MarkupText(
-			f"""
-			in-edges and out-edges
-			""",
-			font="Lucida Console",
-			font_size=20
-		).next_to(t82, DOWN, buff=0.2)
-		t84 = MarkupText(
-			f"""
-			for every edge you use to enter the node, you should use
-			""",
-			font="Lucida Console",
-			font_size=20
-		).next_to(t83, DOWN, buff=0.2)
-		t85 = MarkupText(
-			f"""
-			a different one to leave it, we can say that these edges come in pairs.
-			""",
-			font="Lucida Console",
-			font_size=20
-		).next_to(t84, DOWN, buff=0.2)
-		t86 = MarkupText(
-			f"""
-			That means: <span fgcolor="{RED}">Euler Circuit exists if and only if</span> <span fgcolor="{GREEN}">every single node has an even degree.</span>
-			""",
-			font="Lucida Console",
-			font_size=20
-		).next_to(t85, DOWN, buff=0.2)
+		self.play(my_graph4.move_and_scale(UP, 0.75), run_time=0.5)
+		t82 = self.narration["t82"].next_to(my_graph4, DOWN, buff=0.5)
+		t83 = self.narration["t83"].next_to(t82, DOWN, buff=0.2)
+		t84 = self.narration["t84"].next_to(t83, DOWN, buff=0.2)
+		t85 = self.narration["t85"].next_to(t84, DOWN, buff=0.2)
+		t86 = self.narration["t86"].next_to(t85, DOWN, buff=0.2)
 
 		self.play(Write(t82), run_time=4)
 		self.play(Write(t83), run_time=2)
@@ -477,28 +2132,11 @@ class GraphTheory(Scene):
 		
 		self.wait(0.5)
 		
-		self.play(FadeOut(graphandhighlight), FadeOut(t82), FadeOut(t83), FadeOut(t84), FadeOut(t85), FadeOut(t86))
-
-		node_positions4 = {
-			"A": np.array([0*2, 1*2, 0]), 
-			"B": np.array([1*2, 0*2, 0]), 
-			"C": np.array([-1*2, 0*2, 0]), 
-			"D": np.array([-1*2, -2*2, 0]),
-			"E": np.array([1*2, -2*2, 0]),
-		}
-		edges4 = [
-			("A", "B"),
-			("A", "C"),
-			("B", "C"),
-			("B", "E"),
-			("C", "D"),
-			("D", "E"),
-			("B", "D"),
-			("C", "E"),
-		]
-		
-		
-		my_graph5 = MyGraph(node_positions4, edges4, vertex_radius=0.1)
+		self.play(FadeOut(my_graph4), FadeOut(t82), FadeOut(t83), FadeOut(t84), FadeOut(t85), FadeOut(t86))
+
+	def section_euler_path(self):
+		my_graph5 = self.graph("euler_path")
+		table_text = self.table_text(my_graph5, "t10", 20)
 		self.play(Create(my_graph5.vertices), run_time=1.5)
 		self.play(Create(my_graph5.edge_lines), run_time=1.5)
 		# self.play(my_graph5.animate.move_to(UP), run_time=0.5)
@@ -520,180 +2158,60 @@ class GraphTheory(Scene):
 		# self.play(Write(t9), run_time=3)
 		# self.play(Write(t91), run_time=3)
   		
-		edge_highlight31 = Line(np.array([1, -2, 0]), np.array([1, 0, 0]), color=GREEN, stroke_width=10)
-		edge_highlight32 = Line(np.array([1, 0, 0]), np.array([0, 1, 0]), color=GREEN, stroke_width=10)
-		edge_highlight33 = Line(np.array([0, 1, 0]), np.array([-1, 0, 0]), color=GREEN, stroke_width=10)
-		edge_highlight34 = Line(np.array([-1, 0, 0]), np.array([1, 0, 0]), color=GREEN, stroke_width=10)
-		edge_highlight35 = Line(np.array([1, 0, 0]), np.array([-1, -2, 0]), color=GREEN, stroke_width=10)
-		edge_highlight36 = Line(np.array([-1, -2, 0]), np.array([-1, 0, 0]), color=GREEN, stroke_width=10)
-		edge_highlight37 = Line(np.array([-1, 0, 0]), np.array([1, -2, 0]), color=GREEN, stroke_width=10)
-		edge_highlight38 = Line(np.array([1, -2, 0]), np.array([-1, -2, 0]), color=GREEN, stroke_width=10)
 		self.wait(6)
 
-		self.play(Create(edge_highlight31), run_time=0.5)
-		self.play(Create(edge_highlight32), run_time=0.5)
-		self.play(Create(edge_highlight33), run_time=0.5)
-		self.play(Create(edge_highlight34), run_time=0.5)
-		self.play(Create(edge_highlight35), run_time=0.5)
-		self.play(Create(edge_highlight36), run_time=0.5)
-		self.play(Create(edge_highlight37), run_time=0.5)
-		self.play(Create(edge_highlight38), run_time=0.5)
+		euler_path, path_edges = my_graph5.euler_path(start=self.section_spec("euler_path").get("start", self.odd_pair(my_graph5)[0]))
+		euler_highlight = my_graph5.highlight_path(euler_path, path_edges, color=GREEN, stroke_width=10)
+		self.play(my_graph5.create_highlight(euler_highlight), run_time=0.5 * len(path_edges))
 		
-		schoolg3 = VGroup(my_graph5, edge_highlight31, edge_highlight32, edge_highlight33, edge_highlight34, edge_highlight35, edge_highlight36, edge_highlight37, edge_highlight38)
 
 		self.wait(5)
 		
-		self.play(schoolg3.animate.move_to(UP*2), run_time=0.5)
-
-
-		t10 = MarkupText(
-			f"""
-				Degrees of nodes:
-			""",
-			font="Lucida Console",
-			font_size=20
-		).next_to(schoolg3, DOWN, buff=0.5)
-		t11 = MarkupText(
-			f"""
-				Node 1: 2
-			""",
-			font="Lucida Console",
-			font_size=20
-		).next_to(t10, DOWN, buff=0.25)
-		t12 = MarkupText(
-			f"""
-				Node 2: 4
-			""",
-			font="Lucida Console",
-			font_size=20
-		).next_to(t11, DOWN)
-		t13 = MarkupText(
-			f"""
-				Node 3: 4
-			""",
-			font="Lucida Console",
-			font_size=20
-		).next_to(t12, DOWN)
-		t14 = MarkupText(
-			f"""
-				Node 4: 3
-			""",
-			font="Lucida Console",
-			font_size=20
-		).next_to(t13, DOWN)
-		t15 = MarkupText(
-			f"""
-				Node 5: 3
-			""",
-			font="Lucida Console",
-			font_size=20
-		).next_to(t14, DOWN)
-		t16 = MarkupText(
-			f"""
-			We can see that not all nodes have an even degree.
-			""",
-			font="Lucida Console",
-			font_size=20
-		).next_to(t15, DOWN)
-		t17 = MarkupText(
-			f"""
-			That means that an Euler Circuit doesn't exist in this graph.
-			""",
-			font="Lucida Console",
-			font_size=20
-		).next_to(t16, DOWN)
-		self.play(Write(t10), run_time=0.5)
-		self.play(Write(t11), run_time=0.5)
-		self.play(Write(t12), run_time=0.5)
-		self.play(Write(t13), run_time=0.5)
-		self.play(Write(t14), run_time=0.5)
-		self.play(Write(t15), run_time=0.5)
+		self.play(my_graph5.move_and_scale(UP*2), run_time=0.5)
+
+
+		degree_table = DegreeTable(my_graph5, header=self.narration["t10"], text=table_text)
+		degree_table.next_to(my_graph5, DOWN, buff=0.5)
+		t16 = self.narration["t16"].next_to(degree_table, DOWN)
+		t17 = self.narration["t17"].next_to(t16, DOWN)
+		self.play(degree_table.reveal(row_time=0.5, header_time=0.5))
 		self.play(Write(t16), run_time=3)
 		self.wait(0.5)
 		self.play(Write(t17), run_time=4)
 		self.wait(0.5)
-		self.play(FadeOut(t10), FadeOut(t11), FadeOut(t12), FadeOut(t13), FadeOut(t14), FadeOut(t15), FadeOut(t16), FadeOut(t17))
+		self.play(FadeOut(degree_table), FadeOut(t16), FadeOut(t17))
 		self.wait(1)
-		t18 = MarkupText(
-			f"""
-			But... Who said we should come back where we started?
-			""",
-			font="Lucida Console",
-			font_size=25
-		).next_to(schoolg3, DOWN, buff=0.5)
+		self.my_graph5 = my_graph5
+
+	def section_euler_proof(self):
+		my_graph5 = self.my_graph5
+		t18 = self.narration["t18"].next_to(my_graph5, DOWN, buff=0.5)
 		self.play(Write(t18))
-		t19 = MarkupText(
-			f"""
-			We do not necessarily need a cycle, we just need a <span fgcolor="{RED}">path.</span>
-			""",
-			font="Lucida Console",
-			font_size=25
-		).next_to(t18, DOWN)
-		t20 = MarkupText(
-			f"""
-			A path that visits every single node using each edge exactly once
-			""",
-			font="Lucida Console",
-			font_size=25
-		).next_to(t19, DOWN)
-		t201 = MarkupText(
-			f"""
-				is called an <span fgcolor="{RED}">Euler path.</span>
-			""",
-			font="Lucida Console",
-			font_size=25
-		).next_to(t20, DOWN)
+		t19 = self.narration["t19"].next_to(t18, DOWN)
+		t20 = self.narration["t20"].next_to(t19, DOWN)
+		t201 = self.narration["t201"].next_to(t20, DOWN)
 		self.play(Write(t19))
 		self.play(Write(t20))
 		self.play(Write(t201))
 		self.wait(3)
 		self.play(FadeOut(t18), FadeOut(t19), FadeOut(t20), FadeOut(t201))
-		t211 = MarkupText(
-			f"""
-			Let's examine the conditions needed for such a path to exist.
-			""",
-			font="Lucida Console",
-			font_size=25
-		).next_to(schoolg3, DOWN)
-		t212 = MarkupText(
-			f"""
-			An Euler path exists if:
-			<span fgcolor="{RED}">
-				- it's an Euler Circuit (if all nodes have an even degree).
-				- If exactly 2 nodes have an odd degree.
-			</span>
-			""",
-			font="Lucida Console",
-			font_size=25
-		).next_to(t211, DOWN)
-		t213 = MarkupText(
-			f"""
-			But... How can we prove that?
-			""",
-			font="Lucida Console",
-			font_size=25
-		).next_to(t212, DOWN)
+		t211 = self.narration["t211"].next_to(my_graph5, DOWN)
+		t212 = self.narration["t212"].next_to(t211, DOWN)
+		t213 = self.narration["t213"].next_to(t212, DOWN)
 		self.play(Write(t211), run_time=4)
 		self.play(Write(t212), run_time=9)
 		self.play(Write(t213), run_time=3)
-		ep_proof = Tex("""
-		Let's call a special node : a node having odd degree.
-		Consider a graph $G$ with 0 special nodes. This implies that $G$ has 
-		an Eulerian cycle.
-		Now consider one with 2 special nodes.
-		Let $A$ and $B$ be the two special nodes, and F be their shortest path.
-		Create a new graph $G'$ by removing all edges of F from G.
-		This reduces the degrees of $A$ and $B$ by 1, and all other nodes in $F$ by 2,
-		making $G'$ Eulerian.
-		This implies there exists a cycle from $A$ passing through all edges of $G'$
-		and returning to $A$, denoted as $P$.
-		Since $F$ and $P$ have no common edges and together form all edges of $G$,
-		they are disjoint paths, completing the proof that there exists an Euler path
-		starting at $A$ and ending at $B$.
-		}""",
-		font_size=30,
-		).next_to(schoolg3, DOWN, buff=0.2)
-		self.play(schoolg3.animate.to_edge(UP, buff=0.2), FadeOut(t211), FadeOut(t212), FadeOut(t213))
+		ep_proof = self.narration["ep_proof"].next_to(my_graph5, DOWN, buff=0.2)
+		self.play(my_graph5.animate.to_edge(UP, buff=0.2), FadeOut(t211), FadeOut(t212), FadeOut(t213))
 		self.play(Write(ep_proof), run_time=50)
-		self.wait(2)
-		
+		path_f, path_f_edges, _ = my_graph5.bfs(*self.odd_pair(my_graph5))
+		path_f_highlight = my_graph5.highlight_path(path_f, path_f_edges, color=YELLOW, stroke_width=10)
+		self.play(my_graph5.create_highlight(path_f_highlight), run_time=1)
+		self.wait(1)
+
+if __name__ == "__main__":
+	# python scene.py [spec.json|spec.yaml ...] renders each spec as a variant, or the default script without arguments
+	if len(sys.argv) > 1:
+		print(render_batch(GraphTheory, {f"GraphTheory_{Path(path).stem}": {"spec_path": Path(path)} for path in sys.argv[1:]}))
+	else:
+		print(render_farm(GraphTheory))
@@ -0,0 +1,25 @@
+import numpy as np
+import pytest
+from manim import ORIGIN, UP
+
+from scene import MyGraph
+
+def run(animation):
+	animation.begin()
+	animation.finish()
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_add_node_after_move_and_scale_keeps_edge_lengths(compact):
+	graph = MyGraph({"a": np.array([0, 0, 0]), "b": np.array([2, 0, 0])}, [("a", "b")], compact_edges=compact, compact_vertices=compact)
+	run(graph.move_and_scale(ORIGIN, 3))
+	a, b = graph.get_vertex_centers()
+	length = np.linalg.norm(b - a)
+	graph.add_node("c", a + length * UP)
+	graph.add_edge("a", "c")
+	assert np.allclose(graph.get_positions(), graph.get_vertex_centers())
+	assert np.allclose(graph.get_edge_lengths(), length)
+
+def test_auto_layout_of_an_empty_graph():
+	graph = MyGraph(None, [])
+	assert graph.nodes == []
+	assert graph.get_positions().shape == (0, 3)